@@ -1,27 +1,115 @@
-# This files contains your custom actions which can be used to run
-# custom Python code.
+# Custom actions for the SecureBank assistant, served by `rasa run actions`.
 #
 # See this guide on how to implement these action:
 # https://rasa.com/docs/rasa/custom-actions
 
+import logging
+from typing import Any, Text, Dict, List, Optional, Tuple
 
-# This is a simple example for a custom action which utters "Hello World!"
+from rasa_sdk import Action, Tracker, ValidationAction
+from rasa_sdk.executor import CollectingDispatcher
+from rasa_sdk.events import SlotSet
 
-from typing import Any, Text, Dict, List
+from instrumentation import timed_action
+from actions.resources import language_code
+from response_index import get_response_index
 
-from rasa_sdk import Action, Tracker
-from rasa_sdk.executor import CollectingDispatcher
+logger = logging.getLogger(__name__)
+
+# (responses to utter, language slot value to set)
+Plan = Tuple[Tuple[Text, ...], Optional[Text]]
+
+
+def ask_language_preference_plan(current_language: Optional[Text]) -> Plan:
+    if not current_language:
+        return ("utter_ask_language",), None
+    # Language already set, continue with greeting
+    return ("utter_greet",), None
+
+
+def set_language_plan(entity_value: Optional[Text]) -> Plan:
+    language = language_code(entity_value)
+    if language:
+        # Also greet the user after setting language
+        return ("utter_language_set", "utter_greet"), language
+    # If no language entity found, ask again
+    return ("utter_ask_language",), None
+
+
+def apply_plan(plan: Plan, dispatcher: CollectingDispatcher) -> List[Dict[Text, Any]]:
+    responses, language = plan
+    # Rasa renders response templates before applying this action's SlotSet, so
+    # replies in a newly chosen language are rendered here from the compiled index
+    index = get_response_index() if language else None
+    for response in responses:
+        text = index.text(response, language) if index is not None else None
+        if text is not None:
+            dispatcher.utter_message(text=text)
+        else:
+            dispatcher.utter_message(response=response)
+    return [SlotSet("language", language)] if language else []
+
+
+def language_entity(tracker: Tracker) -> Optional[Text]:
+    for entity in tracker.latest_message.get('entities', []):
+        if entity.get('entity') == 'language':
+            return entity.get('value')
+    return None
+
+
+class ActionAskLanguagePreference(Action):
+    """Ask user for language preference if not set."""
+
+    def name(self) -> Text:
+        return "action_ask_language_preference"
+
+    @timed_action
+    def run(
+        self,
+        dispatcher: CollectingDispatcher,
+        tracker: Tracker,
+        domain: Dict[Text, Any]
+    ) -> List[Dict[Text, Any]]:
+        return apply_plan(ask_language_preference_plan(tracker.get_slot("language")), dispatcher)
+
+
+class ActionSetLanguage(Action):
+    """Set user's language preference."""
+
+    def name(self) -> Text:
+        return "action_set_language"
+
+    @timed_action
+    def run(
+        self,
+        dispatcher: CollectingDispatcher,
+        tracker: Tracker,
+        domain: Dict[Text, Any]
+    ) -> List[Dict[Text, Any]]:
+        plan = set_language_plan(language_entity(tracker))
+        if plan[1]:
+            logger.debug("Language set to %s for %s", plan[1], tracker.sender_id)
+        return apply_plan(plan, dispatcher)
 
 
-class ActionHelloWorld(Action):
+class ValidateCustomSlotMappings(ValidationAction):
+    """Fill the language slot from the message metadata sent by the chatbot UI."""
 
     def name(self) -> Text:
-        return "action_hello_world"
+        return "action_validate_slot_mappings"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    def extract_language(
+        self,
+        dispatcher: CollectingDispatcher,
+        tracker: Tracker,
+        domain: Dict[Text, Any]
+    ) -> Dict[Text, Any]:
 
-        dispatcher.utter_message(text="Hello World!")
+        # An explicit choice ("set language to Hindi") is handled by action_set_language
+        if language_entity(tracker) is not None:
+            return {}
 
-        return []
+        language = language_code((tracker.latest_message.get('metadata') or {}).get('language'))
+        if not language or language == tracker.get_slot("language"):
+            return {}
+        return {"language": language}
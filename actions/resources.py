@@ -0,0 +1,63 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+_MISSING = object()
+
+
+class ResourcePool:
+    """Process-wide, lazily created objects shared by every action in this server.
+
+    Anything costly to build or worth reusing across webhook calls (lookup
+    tables, HTTP sessions to banking back ends) is created on first use and
+    then handed to all requests.
+    """
+
+    def __init__(self):
+        self._items: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        item = self._items.get(name, _MISSING)
+        if item is _MISSING:
+            with self._lock:
+                item = self._items.get(name, _MISSING)
+                if item is _MISSING:
+                    item = self._items[name] = factory()
+        return item
+
+    def close(self):
+        """Close pooled resources that hold connections."""
+        with self._lock:
+            items, self._items = self._items, {}
+        for item in items.values():
+            close = getattr(item, "close", None)
+            if callable(close):
+                close()
+
+
+pool = ResourcePool()
+
+# Every way a user (or NLU) may name a language, mapped to the code the domain conditions on
+_LANGUAGE_ALIASES = {
+    "en": ("english", "अंग्रेज़ी", "अंग्रेजी", "इंग्रजी", "ఇంగ్లీష్", "ಇಂಗ್ಲಿಷ್"),
+    "hi": ("hindi", "हिंदी", "हिन्दी", "హిందీ", "ಹಿಂದಿ"),
+    "mr": ("marathi", "मराठी", "మరాఠీ", "ಮರಾಠಿ"),
+    "te": ("telugu", "तेलुगु", "తెలుగు", "ತೆಲುಗು"),
+    "kn": ("kannada", "कन्नड़", "कन्नड", "కన్నడ", "ಕನ್ನಡ"),
+}
+
+
+def _build_language_codes() -> Dict[str, str]:
+    codes = {}
+    for code, aliases in _LANGUAGE_ALIASES.items():
+        codes[code] = code
+        for alias in aliases:
+            codes[alias] = code
+    return codes
+
+
+def language_code(value: Optional[str]) -> Optional[str]:
+    """Domain language code for an entity or metadata value, or None if unknown."""
+    if not value:
+        return None
+    return pool.get("language_codes", _build_language_codes).get(value.strip().casefold())
@@ -0,0 +1,244 @@
+"""Append-only per-turn event log feeding pages/dashboard.py.
+
+Generate synthetic history with:  python analytics.py --generate 10000000
+EventLog keeps the hourly rollups current as it writes; events appended by
+other means can be folded in from a scheduled job with --rollup.
+"""
+import os
+import time
+import queue
+import random
+import logging
+import sqlite3
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+ANALYTICS_DB = os.environ.get(
+    "ANALYTICS_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics.db")
+)
+# Events are written by a background thread in batches of up to this size
+EVENT_BATCH_SIZE = 256
+# Events waiting to be written; beyond this record() drops them and counts the drop
+EVENT_QUEUE_SIZE = int(os.environ.get("EVENT_QUEUE_SIZE", "10000"))
+# How long a write waits for a lock held by another connection (the dashboard, a generator)
+BUSY_TIMEOUT_SECONDS = 30.0
+UNKNOWN_INTENT = "unknown"
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_NAMES = {"en": "English", "hi": "Hindi", "mr": "Marathi", "te": "Telugu", "kn": "Kannada"}
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " id INTEGER PRIMARY KEY, ts REAL NOT NULL, session TEXT NOT NULL,"
+    " lang TEXT NOT NULL, intent TEXT NOT NULL, latency_ms REAL NOT NULL)",
+    # Pre-rolled hourly totals; their size grows with elapsed time, not with traffic
+    "CREATE TABLE IF NOT EXISTS rollups ("
+    " hour INTEGER NOT NULL, lang TEXT NOT NULL, intent TEXT NOT NULL,"
+    " count INTEGER NOT NULL, latency_sum REAL NOT NULL,"
+    " PRIMARY KEY (hour, lang, intent)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS rollup_state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+
+def connect(path: str = ANALYTICS_DB) -> sqlite3.Connection:
+    # Autocommit mode; multi-statement updates manage their own transactions
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT_SECONDS)
+    # WAL lets the dashboard read while the chatbot keeps appending
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+class EventLog:
+    """Non-blocking writer: record() enqueues, a daemon thread appends in batches.
+
+    A full queue or a failed batch drops events rather than blocking the chat;
+    `dropped` counts them and the writer logs each new loss.
+    """
+
+    def __init__(self, path: str = ANALYTICS_DB, max_queued: int = EVENT_QUEUE_SIZE):
+        self.path = path
+        self.dropped = 0
+        self._reported = 0
+        self._dropped_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=self._writer, name="event-log", daemon=True)
+        self._thread.start()
+
+    def record(self, session_id: str, lang: str, intent: str, latency_ms: float, ts: Optional[float] = None):
+        try:
+            self._queue.put_nowait((ts if ts is not None else time.time(), session_id, lang, intent, latency_ms))
+        except queue.Full:
+            self._drop(1)
+
+    def _drop(self, count: int):
+        with self._dropped_lock:
+            self.dropped += count
+
+    def _report_drops(self):
+        dropped = self.dropped
+        if dropped > self._reported:
+            logger.warning("Event log dropped %d events (%d in total)", dropped - self._reported, dropped)
+            self._reported = dropped
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]):
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT INTO events (ts, session, lang, intent, latency_ms) VALUES (?, ?, ?, ?, ?)", batch
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _writer(self):
+        conn: Optional[sqlite3.Connection] = None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < EVENT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # One failing batch (a locked or unreachable database) must not stop the writer
+            try:
+                if conn is None:
+                    conn = connect(self.path)
+                self._write(conn, batch)
+            except sqlite3.Error:
+                logger.exception("Could not write %d events to %s", len(batch), self.path)
+                self._drop(len(batch))
+                if conn is not None:
+                    conn.close()
+                    conn = None
+            else:
+                # Keeping rollups current here costs O(batch) and spares the dashboard the work;
+                # if it fails the next batch folds these events in
+                try:
+                    update_rollups(conn)
+                except sqlite3.Error:
+                    logger.exception("Could not update rollups in %s", self.path)
+            self._report_drops()
+
+
+def update_rollups(conn: sqlite3.Connection) -> int:
+    """Fold events logged since the last call into the hourly rollup table.
+
+    Returns how many events were folded. The watermark and the rollup rows are
+    updated in one transaction, so concurrent callers never count an event twice.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT value FROM rollup_state WHERE key = 'last_event_id'").fetchone()
+        last_id = row[0] if row else 0
+        (max_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        if max_id <= last_id:
+            conn.execute("COMMIT")
+            return 0
+        conn.execute(
+            "INSERT INTO rollups (hour, lang, intent, count, latency_sum)"
+            " SELECT CAST(ts / 3600 AS INTEGER), lang, intent, COUNT(*), SUM(latency_ms)"
+            " FROM events WHERE id > ? AND id <= ? GROUP BY 1, 2, 3"
+            " ON CONFLICT (hour, lang, intent) DO UPDATE SET"
+            " count = count + excluded.count, latency_sum = latency_sum + excluded.latency_sum",
+            (last_id, max_id),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO rollup_state (key, value) VALUES ('last_event_id', ?)", (max_id,)
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return max_id - last_id
+
+
+_reply_intents: Optional[Dict[str, str]] = None
+
+
+def detect_intent(replies: List[str]) -> str:
+    """Intent behind a turn, recovered from the templated reply Rasa sent back."""
+    global _reply_intents
+    if _reply_intents is None:
+        from domain_data import load_reply_intents
+        _reply_intents = load_reply_intents()
+    for reply in replies:
+        intent = _reply_intents.get(reply.strip())
+        if intent:
+            return intent
+    return UNKNOWN_INTENT
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    """Return the process-wide event writer shared by every Streamlit session."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = EventLog()
+    return _log
+
+
+def generate_events(count: int, days: int = 30, path: str = ANALYTICS_DB, chunk: int = 100000):
+    """Append `count` synthetic events spread over the last `days` days."""
+    intents = ["ask_account_opening", "ask_balance_enquiry", "ask_atm_services", "ask_ifsc_code",
+               "ask_working_hours", "ask_minimum_balance", "greet", "goodbye", UNKNOWN_INTENT]
+    langs = list(LANGUAGE_NAMES)
+    now = time.time()
+    conn = connect(path)
+    written = 0
+    while written < count:
+        n = min(chunk, count - written)
+        rows = [
+            (now - random.random() * days * 86400, f"s{random.randrange(50000):05d}",
+             random.choice(langs), random.choice(intents), random.expovariate(1 / 120.0))
+            for _ in range(n)
+        ]
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO events (ts, session, lang, intent, latency_ms) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        conn.execute("COMMIT")
+        written += n
+    update_rollups(conn)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--generate", type=int, default=0, help="number of synthetic events to append")
+    parser.add_argument("--rollup", action="store_true",
+                        help="fold events not yet in the rollups (for events written without an EventLog)")
+    parser.add_argument("--db", default=ANALYTICS_DB)
+    args = parser.parse_args()
+
+    if args.generate:
+        start = time.perf_counter()
+        generate_events(args.generate, path=args.db)
+        print(f"Generated and rolled up {args.generate} events in {time.perf_counter() - start:.1f} s")
+    if args.rollup:
+        conn = connect(args.db)
+        print(f"Rolled up {update_rollups(conn)} events")
+        conn.close()
+
+    # What a dashboard reload costs, however much raw history there is
+    from dashboard_rollups import DASHBOARD_BUDGET_MS, build_views, load_rollups
+    start = time.perf_counter()
+    views = build_views(load_rollups(args.db))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Dashboard views over {views['total']} events: {elapsed_ms:.1f} ms "
+          f"(budget {DASHBOARD_BUDGET_MS} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from rasa_client import (
+    RASA_URL, RASA_CONNECT_TIMEOUT, RASA_READ_TIMEOUT, RASA_MAX_RETRIES,
+    Attempts, LatencyStats, RasaClientError, get_client,
+)
+from tts_pipeline import TTSPipeline, SpeechJob, get_tts_pipeline
+from instrumentation import span
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent requests from this process to the Rasa server
+RASA_MAX_IN_FLIGHT = int(os.environ.get("RASA_MAX_IN_FLIGHT", "16"))
+# Longest a reader waits for the next reply before giving up on the turn
+TURN_TIMEOUT = RASA_CONNECT_TIMEOUT + RASA_READ_TIMEOUT * (RASA_MAX_RETRIES + 1) + 5
+
+_END = object()
+
+
+class TurnStream:
+    """Bot replies for one turn, readable from the Streamlit thread as they arrive."""
+
+    def __init__(self, message: str, lang: str, speech: Optional[SpeechJob] = None, cached: bool = False):
+        self.message = message
+        self.lang = lang
+        self.speech = speech
+        self.cached = cached
+        self.replies: List[str] = []
+        self.finished = False
+        self.started = time.perf_counter()
+        self.latency_ms = 0.0
+        self._last_reply = self.started
+        self._queue: "queue.Queue" = queue.Queue()
+
+    def push(self, reply: str):
+        self._queue.put(reply)
+
+    def close(self):
+        self.latency_ms = (time.perf_counter() - self.started) * 1000
+        self._queue.put(_END)
+
+    def poll(self) -> List[str]:
+        """Replies that arrived since the last call, without waiting for more."""
+        new: List[str] = []
+        while not self.finished:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                if time.perf_counter() - self._last_reply > TURN_TIMEOUT:
+                    new.append("❌ Connection error: timed out waiting for Rasa")
+                    self.finished = True
+                break
+            self._last_reply = time.perf_counter()
+            if item is _END:
+                self.finished = True
+                break
+            new.append(item)
+        self.replies.extend(new)
+        return new
+
+    def __iter__(self) -> Iterator[str]:
+        # Safe to resume after an interrupted script run: consumed replies are not replayed
+        while not self.finished:
+            try:
+                item = self._queue.get(timeout=TURN_TIMEOUT)
+            except queue.Empty:
+                item = "❌ Connection error: timed out waiting for Rasa"
+                self.finished = True
+            if item is _END:
+                self.finished = True
+                return
+            self.replies.append(item)
+            yield item
+
+
+class AsyncBackend:
+    """Chat backend running on its own event loop thread, outside the Streamlit script run."""
+
+    def __init__(self, url: str = RASA_URL, max_in_flight: int = RASA_MAX_IN_FLIGHT,
+                 tts: Optional[TTSPipeline] = None):
+        self.url = url
+        self.max_in_flight = max_in_flight
+        self.tts = tts if tts is not None else get_tts_pipeline()
+        self.stats = LatencyStats()
+        self.in_flight = 0
+        self.loop = asyncio.new_event_loop()
+        self._limit = asyncio.Semaphore(max_in_flight)
+        self._client = None
+        self._thread = threading.Thread(target=self.loop.run_forever, name="chat-backend", daemon=True)
+        self._thread.start()
+
+    async def _post_httpx(self, payload: Dict) -> List[Dict]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(RASA_READ_TIMEOUT, connect=RASA_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=self.max_in_flight,
+                                    max_keepalive_connections=self.max_in_flight),
+            )
+        # Nothing reached Rasa on these, so retrying is safe; read timeouts and dropped
+        # connections are not retried, as the turn may already have run
+        attempts = Attempts(self.stats, (httpx.ConnectError, httpx.ConnectTimeout))
+        async for _ in attempts:
+            try:
+                resp = await self._client.post(self.url, json=payload)
+            except httpx.RequestError as e:
+                attempts.failed(e)
+                continue
+            if attempts.succeeded(resp.status_code):
+                return attempts.parse(resp.json)
+        raise attempts.exhausted()
+
+    async def _post(self, payload: Dict) -> List[Dict]:
+        if httpx is not None:
+            return await self._post_httpx(payload)
+        # No async HTTP client installed; run the pooled sync client on a worker thread
+        return await self.loop.run_in_executor(
+            None, get_client().send, payload["sender"], payload["message"], payload.get("metadata")
+        )
+
+    async def _turn(self, stream: TurnStream, payload: Dict):
+        try:
+            async with self._limit:
+                self.in_flight += 1
+                try:
+                    with span("rasa_http", payload["sender"]):
+                        data = await self._post(payload)
+                finally:
+                    self.in_flight -= 1
+            for m in data:
+                text = m.get("text")
+                if not text:
+                    continue
+                stream.push(text)
+                # Speech for this reply starts while later replies are still being shown
+                if stream.speech is not None:
+                    self.tts.add(stream.speech, stream.lang, text)
+        except RasaClientError as e:
+            stream.push(f"❌ Connection error: {e}")
+        except Exception as e:
+            # Raised inside a run_coroutine_threadsafe future that nobody awaits, so
+            # without this the turn would end with no reply and no trace
+            logger.exception("Turn for %s failed", payload["sender"])
+            stream.push(f"❌ Error while handling your message: {type(e).__name__}")
+        finally:
+            stream.close()
+
+    def submit_turn(self, session_id: str, message: str, metadata: Dict) -> TurnStream:
+        """Dispatch a message to Rasa without blocking and return its reply stream."""
+        lang = metadata.get("language", "en")
+        stream = TurnStream(message, lang, speech=self.tts.start(session_id))
+        payload = {"sender": session_id, "message": message, "metadata": metadata}
+        asyncio.run_coroutine_threadsafe(self._turn(stream, payload), self.loop)
+        return stream
+
+    def replay_turn(self, session_id: str, message: str, lang: str, replies: List[str]) -> TurnStream:
+        """Stream for replies that are already known, e.g. from the FAQ cache."""
+        stream = TurnStream(message, lang, speech=self.tts.start(session_id), cached=True)
+        for reply in replies:
+            stream.push(reply)
+            if stream.speech is not None:
+                self.tts.add(stream.speech, lang, reply)
+        stream.close()
+        return stream
+
+    def close(self):
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_backend: Optional[AsyncBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> AsyncBackend:
+    """Return the process-wide backend shared by every Streamlit session."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = AsyncBackend()
+    return _backend
@@ -0,0 +1,84 @@
+"""Action-server throughput under concurrent webhook calls.
+
+Starts the real action package (`python -m rasa_sdk --actions actions`) on a
+free port and drives it with the load_test action workload at increasing
+concurrency. Without rasa_sdk installed, the stub action server from
+stub_rasa.py is measured instead, so the numbers then only cover HTTP and
+JSON overhead.
+
+Usage:  python benchmarks/bench_action_server.py --requests 2000 --concurrency 1 4 16
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import importlib.util
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import bench_actions  # noqa: E402
+from benchmarks.stub_rasa import start_action_stub  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_action_server(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "rasa_sdk", "--actions", "actions", "--port", str(port)],
+        cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("action server exited during startup")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return proc
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("action server did not become healthy within 60 s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    proc = stub = None
+    if importlib.util.find_spec("rasa_sdk") is not None:
+        port = free_port()
+        proc = start_action_server(port)
+        url, label = f"http://127.0.0.1:{port}/webhook", "actions package"
+    else:
+        stub = start_action_stub()
+        url, label = stub.url, "stub (rasa_sdk not installed)"
+
+    try:
+        print(f"{label} at {url}")
+        for concurrency in args.concurrency:
+            stats = bench_actions(url, args.requests, concurrency)
+            print(f"  concurrency {concurrency:>3}: {stats['rps']:8.1f} rps, p50 {stats['p50_ms']:6.2f} ms, "
+                  f"p99 {stats['p99_ms']:6.2f} ms, errors {stats['error_rate']:.2%}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if stub is not None:
+            stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Per-rerun cost of rendering chat history: full re-render vs the incremental renderer.
+
+The full re-render formats every message on every rerun, like the old
+render_message loop; the incremental one reuses cached bubble HTML and only
+formats the visible page. Streamlit itself is not needed.
+
+Usage:  python benchmarks/bench_chat_render.py --sizes 1000 10000 --reruns 20
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep benchmark turns out of the real session store
+os.environ.setdefault("SESSION_STORE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from chat_render import CHAT_PAGE_SIZE, message_html, history_html  # noqa: E402
+from conversation_store import ChatMessage, ConversationStore  # noqa: E402
+
+
+def make_history(n: int):
+    store = ConversationStore()
+    for i in range(n):
+        store.append(f"Message number {i} about IFSC codes and branch timings", is_user=i % 2 == 0)
+    return store
+
+
+def full_rerender(messages):
+    return [message_html(m) for m in messages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        messages = make_history(n)
+        # The old renderer walked a plain list holding the whole session
+        everything = [ChatMessage(i, f"Message number {i}", time.time(), i % 2 == 0) for i in range(n)]
+
+        start = time.perf_counter()
+        for _ in range(args.reruns):
+            full_rerender(everything)
+        full_ms = (time.perf_counter() - start) / args.reruns * 1000
+
+        cache = {}
+        start = time.perf_counter()
+        history_html(messages, cache, CHAT_PAGE_SIZE)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for i in range(args.reruns):
+            # Each rerun adds one message, as a chat turn would
+            messages.append("new reply", is_user=False)
+            history_html(messages, cache, CHAT_PAGE_SIZE)
+        warm_ms = (time.perf_counter() - start) / args.reruns * 1000
+
+        print(f"{n:>6} messages: full re-render {full_ms:8.3f} ms/rerun, "
+              f"incremental {warm_ms:6.3f} ms/rerun (first render {cold_ms:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Memory per session: the old list of dicts versus the bounded ConversationStore.
+
+Usage:  python benchmarks/bench_conversation_store.py --turns 1000 10000 50000
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep benchmark turns out of the real session store
+os.environ.setdefault("SESSION_STORE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from conversation_store import ConversationStore  # noqa: E402
+
+
+def old_history(turns: int):
+    messages = []
+    for i in range(turns):
+        messages.append({
+            'content': f"Message number {i} about IFSC codes and branch timings",
+            'timestamp': datetime.datetime.now().strftime('%I:%M %p'),
+            'is_user': i % 2 == 0
+        })
+    return messages
+
+
+def new_history(turns: int):
+    store = ConversationStore()
+    for i in range(turns):
+        store.append(f"Message number {i} about IFSC codes and branch timings", is_user=i % 2 == 0)
+    return store
+
+
+def measure(build, turns: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    history = build(turns)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return history, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    for turns in args.turns:
+        _, old_bytes, old_s = measure(old_history, turns)
+        store, new_bytes, new_s = measure(new_history, turns)
+        print(f"{turns:>6} turns: list of dicts {old_bytes / 1024:9.1f} KiB ({old_s * 1000:6.1f} ms), "
+              f"ConversationStore {new_bytes / 1024:7.1f} KiB ({new_s * 1000:6.1f} ms), "
+              f"{len(store) - store.spilled} in memory / {store.spilled} spilled")
+
+
+if __name__ == "__main__":
+    main()
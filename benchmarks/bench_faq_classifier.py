@@ -0,0 +1,114 @@
+"""Accuracy and latency of faq_classifier against the Rasa round trip.
+
+Accuracy is leave-one-out over nlu.yml: each example is classified by a model
+built without it. For each threshold the script reports how many FAQ
+examples would be answered in-process (coverage), how many of those answers
+are right (precision), and how many non-FAQ messages would wrongly be
+answered. The calibrated per-intent limits are then checked k-fold: each
+fold is answered by a model fitted and calibrated on the other folds only,
+and the script exits non-zero if precision misses
+FAQ_CLASSIFIER_TARGET_PRECISION. Latency compares one classify() call with one Rasa turn: the local
+stub by default, or the real server's /model/parse with --live, which also
+reports DIET's intent accuracy on the same examples (trained on them, so an
+upper bound).
+
+Usage:  python benchmarks/bench_faq_classifier.py [--live] [--thresholds 0.3 0.5 0.7] [--folds 5]
+"""
+import os
+import sys
+import time
+import argparse
+from typing import List, Tuple
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_data import load_nlu_examples, load_stateless_rules  # noqa: E402
+from faq_classifier import (  # noqa: E402
+    FAQ_CLASSIFIER_MARGIN, FAQ_CLASSIFIER_TARGET_PRECISION, FAQClassifier, build_calibrated, held_out_predictions,
+)
+from rasa_client import RASA_URL, RasaClient  # noqa: E402
+from benchmarks.stub_rasa import start_stub  # noqa: E402
+
+
+def cross_validated(examples: List[Tuple[str, str]], folds: int) -> Tuple[int, int, int]:
+    """(answered, correct, FAQ examples) for calibrated limits on folds unseen by fitting and calibration."""
+    faq_intents = set(load_stateless_rules())
+    answered = correct = faq_total = 0
+    for k in range(folds):
+        train = [example for i, example in enumerate(examples) if i % folds != k]
+        classifier = build_calibrated(train)
+        for intent, text in examples[k::folds]:
+            faq_total += intent in faq_intents
+            predicted = classifier.faq_intent(text)
+            if predicted is not None:
+                answered += 1
+                correct += predicted == intent
+    return answered, correct, faq_total
+
+
+def time_per_call_ms(fn, items, rounds: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (rounds * len(items)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.3, 0.4, 0.5, 0.6, 0.7])
+    parser.add_argument("--margin", type=float, default=FAQ_CLASSIFIER_MARGIN)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="compare with the running Rasa server")
+    args = parser.parse_args()
+
+    examples = load_nlu_examples()
+    faq_intents = set(load_stateless_rules())
+    results = held_out_predictions(examples)
+    faq_total = sum(intent in faq_intents for intent, _ in examples)
+    top1 = sum(intent == predicted for intent, predicted, _, _ in results) / len(results)
+    print(f"{len(examples)} examples, {faq_total} for stateless FAQ intents; "
+          f"leave-one-out top-1 accuracy {top1:.3f}")
+    print(f"{'threshold':>9} {'coverage':>9} {'precision':>9} {'non-FAQ answered':>17}")
+    for threshold in args.thresholds:
+        answered = [(intent, predicted) for intent, predicted, score, lead in results
+                    if predicted in faq_intents and score >= threshold and lead >= args.margin]
+        correct = sum(intent == predicted for intent, predicted in answered)
+        on_faq = sum(intent in faq_intents for intent, _ in answered)
+        wrong_tier = len(answered) - on_faq
+        print(f"{threshold:>9.2f} {on_faq / faq_total:>9.1%} "
+              f"{(correct / len(answered)) if answered else 1:>9.1%} {wrong_tier:>17}")
+
+    answered, correct, faq_total = cross_validated(examples, args.folds)
+    precision = correct / answered if answered else 1.0
+    print(f"calibrated per-intent limits, {args.folds}-fold: coverage {correct / faq_total:.1%}, "
+          f"precision {precision:.1%} ({answered - correct} wrong of {answered}), "
+          f"target {FAQ_CLASSIFIER_TARGET_PRECISION:.0%}")
+
+    classifier = FAQClassifier.build(examples)
+    texts = [text for _, text in examples]
+    local_ms = time_per_call_ms(lambda t: classifier.answer(t, "en"), texts, rounds=20)
+    if args.live:
+        parse_url = RASA_URL.split("/webhooks/")[0] + "/model/parse"
+        session = requests.Session()
+        parsed = [session.post(parse_url, json={"text": t}, timeout=30).json() for t in texts]
+        diet = sum(p.get("intent", {}).get("name") == intent for p, (intent, _) in zip(parsed, examples))
+        print(f"DIET intent accuracy on the same examples (seen in training): {diet / len(examples):.3f}")
+        remote_ms = time_per_call_ms(lambda t: session.post(parse_url, json={"text": t}, timeout=30), texts)
+        label = "Rasa /model/parse"
+    else:
+        server = start_stub()
+        client = RasaClient(url=server.url)
+        remote_ms = time_per_call_ms(lambda t: client.send("bench", t), texts)
+        client.close()
+        server.shutdown()
+        label = "stub webhook round trip (lower bound for Rasa)"
+    print(f"classifier answer(): {local_ms * 1000:8.1f} us per message")
+    print(f"{label}: {remote_ms * 1000:8.1f} us per message")
+    return 0 if precision >= FAQ_CLASSIFIER_TARGET_PRECISION else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
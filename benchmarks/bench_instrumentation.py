@@ -0,0 +1,74 @@
+"""Cost of a timing span with instrumentation on, off, and with the span log.
+
+Also serves the histograms once and prints the scrape, as a smoke test of
+the /metrics endpoint.
+
+Usage:  python benchmarks/bench_instrumentation.py --spans 200000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation  # noqa: E402
+from instrumentation import Metrics, serve_metrics  # noqa: E402
+
+
+def per_span_ns(metrics: Metrics, spans: int) -> float:
+    start = time.perf_counter()
+    for _ in range(spans):
+        with metrics.span("sanitize_input", "bench"):
+            pass
+    return (time.perf_counter() - start) / spans * 1e9
+
+
+def module_span_ns(spans: int) -> float:
+    """instrumentation.span(), the call sites' entry point, with INSTRUMENTATION_ENABLED=0."""
+    enabled = instrumentation.INSTRUMENTATION_ENABLED
+    instrumentation.INSTRUMENTATION_ENABLED = False
+    try:
+        start = time.perf_counter()
+        for _ in range(spans):
+            with instrumentation.span("sanitize_input", "bench"):
+                pass
+        return (time.perf_counter() - start) / spans * 1e9
+    finally:
+        instrumentation.INSTRUMENTATION_ENABLED = enabled
+
+
+def baseline_ns(spans: int) -> float:
+    start = time.perf_counter()
+    for _ in range(spans):
+        pass
+    return (time.perf_counter() - start) / spans * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spans", type=int, default=200000)
+    args = parser.parse_args()
+
+    log_path = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+    loop = baseline_ns(args.spans)
+    print(f"empty loop:        {loop:8.0f} ns/iteration")
+    print(f"disabled:          {per_span_ns(Metrics(enabled=False), args.spans) - loop:8.0f} ns/span")
+    print(f"disabled, span():  {module_span_ns(args.spans) - loop:8.0f} ns/span")
+    enabled = Metrics(enabled=True, log_path="")
+    print(f"enabled:           {per_span_ns(enabled, args.spans) - loop:8.0f} ns/span")
+    print(f"enabled + log:     {per_span_ns(Metrics(enabled=True, log_path=log_path), args.spans) - loop:8.0f} ns/span")
+
+    server = serve_metrics(enabled, 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        scrape = resp.read().decode("utf-8")
+    server.shutdown()
+    print(f"\nGET {url}:")
+    print("\n".join(line for line in scrape.splitlines() if "_bucket" not in line))
+
+
+if __name__ == "__main__":
+    main()
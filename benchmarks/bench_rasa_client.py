@@ -0,0 +1,67 @@
+"""Compare per-message requests.post against the pooled RasaClient on a stub webhook.
+
+Usage:  python benchmarks/bench_rasa_client.py --requests 2000 --concurrency 8
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rasa_client import RasaClient  # noqa: E402
+from benchmarks.stub_rasa import start_stub  # noqa: E402
+
+
+def run(label: str, call, total: int, concurrency: int, server):
+    hits_before, conns_before = server.hits, server.connections
+    latencies = []
+
+    def one(i: int):
+        start = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{label:<14} {total / wall:8.0f} req/s  "
+        f"p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms  "
+        f"hits {server.hits - hits_before}  tcp connections {server.connections - conns_before}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_stub(delay=args.delay_ms / 1000)
+    payload = {"sender": "bench", "message": "What is the IFSC code?"}
+
+    def bare(i: int):
+        requests.post(server.url, json=payload, timeout=10).json()
+
+    client = RasaClient(url=server.url, pool_size=args.concurrency)
+
+    def pooled(i: int):
+        client.send("bench", payload["message"])
+
+    run("requests.post", bare, args.requests, args.concurrency, server)
+    run("RasaClient", pooled, args.requests, args.concurrency, server)
+    print("client stats:", client.stats.snapshot())
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
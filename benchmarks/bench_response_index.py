@@ -0,0 +1,61 @@
+"""Startup and lookup cost of the compiled response index versus parsing domain.yml.
+
+"yaml" is what every consumer did before: parse the domain and build a
+{(name, lang): text} dict. "index" maps response_index.bin (built first if
+stale). Lookups cover every (response, language) pair of the domain.
+
+Usage:  python benchmarks/bench_response_index.py [--rounds 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_data import DOMAIN_PATH, iter_domain_responses  # noqa: E402
+from response_index import RESPONSE_INDEX_PATH, ResponseIndex, load_or_build  # noqa: E402
+
+
+def yaml_table():
+    table = {}
+    for name, lang, text in iter_domain_responses(DOMAIN_PATH):
+        table.setdefault((name, lang), text)
+    return table
+
+
+def best_ms(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    load_or_build(DOMAIN_PATH, RESPONSE_INDEX_PATH).close()
+    print(f"startup, best of {args.rounds}:")
+    print(f"  yaml   parse domain + build dict   {best_ms(yaml_table, args.rounds):8.3f} ms")
+    print(f"  index  mmap response_index.bin     "
+          f"{best_ms(lambda: ResponseIndex.open(RESPONSE_INDEX_PATH).close(), args.rounds):8.3f} ms")
+    print(f"  index  fingerprint check + mmap    "
+          f"{best_ms(lambda: load_or_build(DOMAIN_PATH, RESPONSE_INDEX_PATH).close(), args.rounds):8.3f} ms")
+
+    table = yaml_table()
+    index = ResponseIndex.open(RESPONSE_INDEX_PATH)
+    pairs = [(name, lang) for name, lang in table] * 100
+    for label, lookup in (("dict", lambda p: table.get(p)), ("index", lambda p: index.text(*p))):
+        start = time.perf_counter()
+        for pair in pairs:
+            lookup(pair)
+        print(f"  {label:<6} lookup {(time.perf_counter() - start) / len(pairs) * 1e6:8.2f} us")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-message cost of the old two-regex sanitize_input versus sanitizer.py.
+
+Inputs are the nlu.yml examples (all five languages) plus padded long messages.
+
+Usage:  python benchmarks/bench_sanitizer.py --rounds 200
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_data import load_nlu_examples  # noqa: E402
+from sanitizer import cache_key, sanitize_input  # noqa: E402
+
+
+def old_sanitize_input(user_input: str) -> str:
+    if not user_input:
+        return ""
+    sanitized = re.sub(r"[<>\"']", '', user_input)
+    sanitized = re.sub(r'(javascript|script|eval|exec)', '', sanitized, flags=re.IGNORECASE)
+    return sanitized.strip()[:500]
+
+
+def per_call_us(fn, inputs, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    short = [text for _, text in load_nlu_examples()]
+    long = [("  " + text + " <b>'execute'</b> ") * 20 for text in short[:20]]
+    for label, inputs in (("nlu examples", short), ("long messages", long)):
+        old = per_call_us(old_sanitize_input, inputs, args.rounds)
+        new = per_call_us(sanitize_input, inputs, args.rounds)
+        keyed = per_call_us(lambda t: cache_key(sanitize_input(t)), inputs, args.rounds)
+        print(f"{label:<14} ({len(inputs):>3}): old {old:6.2f} us, new {new:6.2f} us, "
+              f"new + cache key {keyed:6.2f} us")
+
+    corrupted = sum(old_sanitize_input(t) != " ".join(t.split()) for t in short)
+    print(f"nlu examples altered by the old sanitizer: {corrupted}, by the new one: "
+          f"{sum(sanitize_input(t) != ' '.join(t.split()) for t in short)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Cold-start and per-rerun cost of the Streamlit entry point.
+
+Every sample runs in a fresh interpreter, so imports are paid in full:
+
+  imports        importing what chatbot.py imports at module level, now
+                 (parsed from the file) versus before lazy loading
+  first render   AppTest.from_file("chatbot.py").run() in a new process,
+                 i.e. time to the first complete page (needs streamlit)
+  rerun          mean time of further script runs in the same session
+  warm-up        time until the background warm-up thread has finished
+
+Session and analytics databases go to a temporary directory.
+
+Usage:  python benchmarks/bench_startup.py [--samples 5] [--reruns 20]
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT = os.path.join(BASE_DIR, "chatbot.py")
+
+# chatbot.py's module-level imports before the backend, FAQ tiers and analytics were made lazy
+EAGER_IMPORTS = [
+    "dedupe", "faq_cache", "faq_classifier", "async_backend", "chat_render", "conversation_store",
+    "session_store", "analytics", "instrumentation", "sanitizer", "language_detect",
+]
+
+IMPORT_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+APP_SNIPPET = """
+import sys, time, json, threading
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({chatbot!r}, default_timeout=60)
+at.run()
+first = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(str(at.exception))
+reruns = []
+for _ in range({reruns}):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+for thread in threading.enumerate():
+    if thread.name == "warm-up":
+        thread.join()
+print(json.dumps({{"first": first, "rerun": sum(reruns) / len(reruns),
+                  "warm": time.perf_counter() - start}}))
+"""
+
+
+def module_imports(path: str) -> List[str]:
+    """Project modules imported at module level (outside functions and TYPE_CHECKING blocks)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return [name for name in names
+            if os.path.exists(os.path.join(BASE_DIR, name.split(".")[0] + ".py"))]
+
+
+def run_snippet(code: str, env: Dict[str, str]) -> Dict:
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=BASE_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = dict(os.environ,
+               SESSION_STORE_URL=f"sqlite:///{os.path.join(workdir, 'sessions.db')}",
+               ANALYTICS_DB=os.path.join(workdir, "analytics.db"),
+               METRICS_PORT="0")
+
+    lazy = module_imports(CHATBOT)
+    print(f"module-level imports, median of {args.samples} fresh interpreters:")
+    for label, modules in (("before", EAGER_IMPORTS), ("now", lazy)):
+        seconds = [run_snippet(IMPORT_SNIPPET.format(base=BASE_DIR, modules=modules), env)["seconds"]
+                   for _ in range(args.samples)]
+        print(f"  {label:<7} {statistics.median(seconds) * 1000:8.1f} ms  ({', '.join(modules)})")
+
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        print("streamlit is not installed; skipping first render and rerun timings")
+        return
+    samples = [run_snippet(APP_SNIPPET.format(base=BASE_DIR, chatbot=CHATBOT, reruns=args.reruns), env)
+               for _ in range(args.samples)]
+    for key, label in (("first", "time to first render"), ("rerun", "per-rerun overhead"),
+                       ("warm", "warm-up finished after")):
+        print(f"  {label:<24} {statistics.median(s[key] for s in samples) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Wall time and intent accuracy of full versus incremental training.
+
+Works on a copy of the training data in a temporary directory. Every fourth
+example of each intent is held out for evaluation. The script then:
+
+  1. trains from scratch                          (train.py, full)
+  2. adds a few FAQ paraphrases and retrains      (train.py picks fine-tuning)
+  3. trains the same updated data from scratch    (reference for step 2)
+
+Each model is scored with `rasa test nlu` on the held-out examples. Needs
+rasa installed.
+
+Usage:  python benchmarks/bench_training.py [--profile fast]
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Tuple
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_data import DOMAIN_PATH, NLU_PATH, RULES_PATH, STORIES_PATH  # noqa: E402
+from train import PROFILES, train  # noqa: E402
+
+# Paraphrases added between runs 1 and 2: new examples for existing intents only
+NEW_FAQ_EXAMPLES = {
+    "ask_balance_enquiry": ["how much money do I have", "show me my available balance"],
+    "ask_customer_care": ["I need to talk to customer support", "helpline number please"],
+    "ask_loan_services": ["can I get a personal loan", "what loans do you offer"],
+}
+
+
+def read_blocks(path: str) -> List[Tuple[str, List[str]]]:
+    """(intent, raw example lines with entity markup) from an NLU file."""
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    blocks = []
+    for block in data.get("nlu") or []:
+        if block.get("intent"):
+            lines = [line.strip()[2:] for line in (block.get("examples") or "").splitlines()
+                     if line.strip().startswith("- ")]
+            blocks.append((block["intent"], lines))
+    return blocks
+
+
+def write_blocks(path: str, blocks: List[Tuple[str, List[str]]]):
+    out = ['version: "3.1"', "nlu:"]
+    for intent, lines in blocks:
+        if not lines:
+            continue
+        out += [f"- intent: {intent}", "  examples: |"] + [f"    - {line}" for line in lines]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def accuracy(model: str, holdout: str, workdir: str) -> float:
+    results = os.path.join(workdir, "results")
+    subprocess.run(["rasa", "test", "nlu", "--model", model, "--nlu", holdout, "--out", results],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(os.path.join(results, "intent_report.json"), encoding="utf-8") as f:
+        return float(json.load(f)["accuracy"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="full")
+    args = parser.parse_args()
+    if shutil.which("rasa") is None:
+        print("rasa is not installed; nothing to measure")
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix="bench-training-")
+    paths = {name: os.path.join(workdir, os.path.basename(src)) for name, src in
+             (("domain", DOMAIN_PATH), ("nlu", NLU_PATH), ("rules", RULES_PATH), ("stories", STORIES_PATH))}
+    for name, src in (("domain", DOMAIN_PATH), ("rules", RULES_PATH), ("stories", STORIES_PATH)):
+        shutil.copy(src, paths[name])
+
+    train_blocks, holdout_blocks = [], []
+    for intent, lines in read_blocks(NLU_PATH):
+        held = lines[3::4] if len(lines) >= 4 else []
+        train_blocks.append((intent, [line for line in lines if line not in held]))
+        holdout_blocks.append((intent, held))
+    holdout = os.path.join(workdir, "holdout.yml")
+    write_blocks(holdout, holdout_blocks)
+    write_blocks(paths["nlu"], train_blocks)
+
+    out = os.path.join(workdir, "models")
+    state = os.path.join(workdir, "train_state.json")
+    rows: List[Dict] = []
+
+    def run(label: str, force_full: bool):
+        result = train(args.profile, paths, out=out, state_path=state, force_full=force_full)
+        rows.append({"run": label, "mode": result["mode"], "seconds": result["seconds"],
+                     "accuracy": accuracy(result["model"], holdout, workdir)})
+
+    run("initial", force_full=True)
+    write_blocks(paths["nlu"], [(intent, lines + NEW_FAQ_EXAMPLES.get(intent, []))
+                                for intent, lines in train_blocks])
+    run("add FAQ examples", force_full=False)
+    run("same data, from scratch", force_full=True)
+
+    print(f"profile {args.profile}, {sum(len(lines) for _, lines in holdout_blocks)} held-out examples")
+    for row in rows:
+        print(f"  {row['run']:<24} {row['mode']:<9} {row['seconds']:7.1f} s  accuracy {row['accuracy']:.3f}")
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
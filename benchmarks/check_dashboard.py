@@ -0,0 +1,60 @@
+"""Check that a dashboard reload stays read-only and within DASHBOARD_BUDGET_MS.
+
+Generates synthetic events into a temporary database, then times
+load_rollups + build_views (the work pages/dashboard.py does on a cache
+miss) and fails if the median exceeds the budget. Events appended after the
+rollup must not change the database on a reload: only the event writer
+folds them in.
+
+Usage:  python benchmarks/check_dashboard.py [--events 1000000] [--samples 5]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    from analytics import connect, generate_events, update_rollups
+    from dashboard_rollups import DASHBOARD_BUDGET_MS, build_views, load_rollups
+
+    path = os.path.join(tempfile.mkdtemp(prefix="check-dashboard-"), "analytics.db")
+    generate_events(args.events, path=path)
+
+    # An event the writer has not folded in yet: a reload must leave it alone
+    conn = connect(path)
+    conn.execute("INSERT INTO events (ts, session, lang, intent, latency_ms) VALUES (?, 's', 'en', 'greet', 1)",
+                 (time.time(),))
+    before = os.stat(path).st_mtime_ns, os.stat(path + "-wal").st_size
+    timings = []
+    for _ in range(args.samples):
+        start = time.perf_counter()
+        views = build_views(load_rollups(path))
+        timings.append((time.perf_counter() - start) * 1000)
+    after = os.stat(path).st_mtime_ns, os.stat(path + "-wal").st_size
+    assert after == before, "load_rollups wrote to the database"
+    assert views["total"] == args.events, views["total"]
+    print(f"reload over {args.events} events is read-only: ok")
+
+    assert update_rollups(conn) == 1
+    conn.close()
+    median = statistics.median(timings)
+    print(f"median reload {median:.1f} ms (budget {DASHBOARD_BUDGET_MS} ms)")
+    if median > DASHBOARD_BUDGET_MS:
+        print("FAIL: over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Regression check: one submitted message must produce exactly one webhook hit.
+
+Drives the real chatbot.send_message callback, firing it twice for the same
+submission as the Enter-key on_change and the Send button do, then lets
+chatbot.stream_replies dispatch and drain the queued turn against the stub
+webhook. A deliberate re-send of the same text in a later interaction must
+produce a second hit. Streamlit itself is replaced by a minimal stand-in
+(session state plus no-op elements), so the check runs without it.
+
+Usage:  python benchmarks/check_dispatch.py
+"""
+import os
+import sys
+import time
+import types
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORKDIR = tempfile.mkdtemp(prefix="check-dispatch-")
+os.environ.update(
+    SESSION_STORE_URL=f"sqlite:///{os.path.join(WORKDIR, 'sessions.db')}",
+    ANALYTICS_DB=os.path.join(WORKDIR, "analytics.db"),
+    FAQ_CACHE_ENABLED="0", METRICS_PORT="0",
+)
+
+
+class SessionState(dict):
+    """st.session_state: a dict that also allows attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
+
+def fake_streamlit() -> types.ModuleType:
+    """Just enough of streamlit for chatbot.py to import and run its callbacks."""
+    st = types.ModuleType("streamlit")
+    st.session_state = SessionState()
+    st.query_params = {}
+    # Every other element (markdown, error, rerun, ...) renders nothing
+    st.__getattr__ = lambda name: (lambda *args, **kwargs: None)
+    return st
+
+
+def main() -> int:
+    st = sys.modules["streamlit"] = fake_streamlit()
+
+    import chatbot
+    import async_backend
+    from tts_pipeline import TTSPipeline
+    from conversation_store import ConversationStore
+    from benchmarks.stub_rasa import start_stub
+
+    server = start_stub()
+    # The process-wide backend, pointed at the stub and without speech
+    async_backend._backend = async_backend.AsyncBackend(url=server.url, tts=TTSPipeline(backend=(None, False)))
+    st.session_state.update(messages=ConversationStore(), html_cache={}, rendered_messages=0,
+                            session_id="check-session", input_counter=0)
+
+    def interaction(message: str, callbacks: int):
+        # chatbot.main bumps the counter once per script run
+        st.session_state.input_counter += 1
+        for _ in range(callbacks):
+            # Each callback sees the value the widget submitted
+            st.session_state.user_input = message
+            chatbot.send_message()
+        deadline = time.monotonic() + 10
+        while chatbot.turn_pending() and time.monotonic() < deadline:
+            chatbot.stream_replies()
+            time.sleep(0.01)
+
+    # Enter and Send both fire for the first submission
+    interaction("What is the IFSC code?", callbacks=2)
+    after_double_fire = server.hits
+    # The user then deliberately asks the same question again
+    interaction("What is the IFSC code?", callbacks=1)
+    after_resend = server.hits
+    replies = [m.content for m in st.session_state.messages.recent(10) if not m.is_user]
+
+    async_backend._backend.close()
+    server.shutdown()
+
+    ok = after_double_fire == 1 and after_resend == 2 and len(replies) == 2
+    print(f"hits after double fire: {after_double_fire} (expected 1)")
+    print(f"hits after re-send:     {after_resend} (expected 2)")
+    print(f"bot replies in history: {len(replies)} (expected 2)")
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
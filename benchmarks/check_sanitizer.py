@@ -0,0 +1,88 @@
+"""Fuzz check for sanitizer.py across the five chat languages.
+
+Builds random messages from each language's script mixed with markup,
+control, bidi and zero-width characters, in composed and decomposed form,
+and asserts the properties the chatbot relies on:
+
+  * output is NFC, at most MAX_INPUT_CHARS long, with single inner spaces
+  * no control or bidi characters survive; ZWJ/ZWNJ do
+  * sanitizing is idempotent and NFC/NFD input give the same result and key
+  * escape_html output contains no raw markup and round-trips via html.unescape
+  * nlu.yml examples pass through unchanged apart from whitespace
+
+Usage:  python benchmarks/check_sanitizer.py --iterations 20000
+"""
+import os
+import sys
+import html
+import random
+import argparse
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_data import load_nlu_examples  # noqa: E402
+from sanitizer import MAX_INPUT_CHARS, cache_key, escape_html, sanitize_input  # noqa: E402
+
+SCRIPTS = {
+    "English": [chr(c) for c in range(0x41, 0x5B)] + [chr(c) for c in range(0x61, 0x7B)],
+    # Hindi and Marathi share Devanagari; include nukta letters, which NFC decomposes
+    "Hindi": [chr(c) for c in range(0x0900, 0x0980)],
+    "Marathi": [chr(c) for c in range(0x0900, 0x0980)],
+    "Telugu": [chr(c) for c in range(0x0C00, 0x0C80)],
+    "Kannada": [chr(c) for c in range(0x0C80, 0x0D00)],
+}
+NOISE = list("<>&\"'/=;:?!.,। \t\n") + ["\x00", "\x07", "\x1b", "\x7f", "\x85", "\u200b", "\ufeff",
+                                          "\u202e", "\u2066", "\u200c", "\u200d", "🏦", "script", "exec"]
+FORBIDDEN = {chr(c) for c in range(0x20)} | {chr(c) for c in range(0x7F, 0xA0)} | {
+    "\u200b", "\u2060", "\ufeff"} | {chr(c) for c in range(0x202A, 0x202F)} | {chr(c) for c in range(0x2066, 0x206A)}
+
+
+def random_message(rng: random.Random, alphabet) -> str:
+    length = rng.choice([0, 1, 5, 40, 200, MAX_INPUT_CHARS + 50])
+    return "".join(rng.choice(alphabet) if rng.random() < 0.8 else rng.choice(NOISE) for _ in range(length))
+
+
+def check(text: str):
+    out = sanitize_input(text)
+    assert unicodedata.is_normalized("NFC", out), repr(text)
+    assert len(out) <= MAX_INPUT_CHARS, repr(text)
+    assert out == out.strip() and "  " not in out, repr(out)
+    assert not FORBIDDEN & set(out), repr(out)
+    assert sanitize_input(out) == out, repr(text)
+    decomposed = unicodedata.normalize("NFD", text)
+    assert sanitize_input(decomposed) == out, repr(text)
+    assert cache_key(sanitize_input(decomposed)) == cache_key(out), repr(text)
+    escaped = escape_html(out)
+    assert not set("<>\"'") & set(escaped), repr(escaped)
+    assert html.unescape(escaped) == out, repr(out)
+    for joiner in ("\u200c", "\u200d"):
+        if len(text) <= MAX_INPUT_CHARS and joiner in text:
+            assert joiner in out, repr(text)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for language, alphabet in SCRIPTS.items():
+        for _ in range(args.iterations // len(SCRIPTS)):
+            check(random_message(rng, alphabet))
+        print(f"{language:<8} ok")
+
+    examples = [text for _, text in load_nlu_examples()]
+    for text in examples:
+        check(text)
+        assert sanitize_input(text) == " ".join(text.split()), repr(text)
+    for word in ("execute my transfer", "description", "evaluation", "javascript tutorial"):
+        assert sanitize_input(word) == word, word
+    print(f"{len(examples)} nlu examples unchanged")
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
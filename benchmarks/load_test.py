@@ -0,0 +1,210 @@
+"""Load test for the chatbot -> Rasa -> actions path.
+
+Replays the multilingual nlu.yml examples through the same backend that
+send_to_rasa uses, and action-server calls for the custom language actions,
+at a fixed concurrency. Local stubs stand in for Rasa and the action server
+unless --live is given. Results are written as JSON so runs can be diffed.
+
+Usage:
+    python benchmarks/load_test.py --requests 2000 --concurrency 16 --out results.json
+    python benchmarks/load_test.py --live --compare results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import itertools
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_data import load_action_endpoint, load_nlu_examples  # noqa: E402
+from language_detect import detect_language  # noqa: E402
+from rasa_client import RASA_URL  # noqa: E402
+from async_backend import AsyncBackend  # noqa: E402
+from tts_pipeline import TTSPipeline  # noqa: E402
+from instrumentation import get_metrics  # noqa: E402
+from benchmarks.stub_rasa import start_action_stub, start_stub  # noqa: E402
+
+LANGUAGE_CODES = ["en", "hi", "mr", "te", "kn"]
+ACTIONS = ["action_set_language", "action_ask_language_preference"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(call: Callable[[int, object], bool], workload: List, total: int, concurrency: int) -> Dict:
+    """Run `total` calls over `concurrency` workers and summarize latency and errors."""
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker(worker_id: int):
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            start = time.perf_counter()
+            try:
+                ok = call(worker_id, workload[i % len(workload)])
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "rps": round(total / wall, 1) if wall else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def rasa_workload() -> List[Tuple[str, str]]:
+    examples = [(text, detect_language(text) or "en") for _, text in load_nlu_examples()]
+    random.Random(42).shuffle(examples)
+    return examples
+
+
+def action_workload() -> List[Dict]:
+    payloads = []
+    for i, (action, lang) in enumerate(itertools.product(ACTIONS, LANGUAGE_CODES)):
+        payloads.append({
+            "next_action": action,
+            "sender_id": f"load-{i}",
+            "version": "3.1",
+            "tracker": {
+                "sender_id": f"load-{i}",
+                "slots": {"language": None},
+                "latest_message": {"text": lang, "entities": [{"entity": "language", "value": lang}]},
+                "events": [],
+            },
+            "domain": {},
+        })
+    return payloads
+
+
+def bench_rasa(url: str, total: int, concurrency: int) -> Dict:
+    # Speech is disabled so only the Rasa round trip is measured
+    backend = AsyncBackend(url=url, max_in_flight=concurrency, tts=TTSPipeline(backend=(None, False)))
+
+    def call(worker_id: int, item) -> bool:
+        text, lang = item
+        stream = backend.submit_turn(f"load-{worker_id}", text, {"language": lang})
+        replies = list(stream)
+        return bool(replies) and not any(r.startswith("❌") for r in replies)
+
+    try:
+        return run_load(call, rasa_workload(), total, concurrency)
+    finally:
+        backend.close()
+
+
+def bench_actions(url: str, total: int, concurrency: int) -> Dict:
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def call(worker_id: int, payload) -> bool:
+        resp = session.post(url, json=payload, timeout=10)
+        return resp.status_code == 200 and "events" in resp.json()
+
+    try:
+        return run_load(call, action_workload(), total, concurrency)
+    finally:
+        session.close()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, previous: Dict):
+    """Print the change of each metric against an earlier results file."""
+    for target, stats in current["results"].items():
+        old = previous.get("results", {}).get(target)
+        if not old:
+            continue
+        print(f"{target} vs {previous.get('commit') or 'previous run'}:")
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"):
+            if key in old and old[key]:
+                change = (stats[key] - old[key]) / old[key] * 100
+                print(f"  {key:<10} {old[key]:>10} -> {stats[key]:>10} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--target", choices=["rasa", "actions", "all"], default="all")
+    parser.add_argument("--live", action="store_true", help="hit the real Rasa and action servers")
+    parser.add_argument("--stub-delay-ms", type=float, default=0.0)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    stubs = []
+    if args.live:
+        rasa_url, action_url = RASA_URL, load_action_endpoint()
+    else:
+        stubs = [start_stub(delay=args.stub_delay_ms / 1000), start_action_stub(delay=args.stub_delay_ms / 1000)]
+        rasa_url, action_url = stubs[0].url, stubs[1].url
+
+    results = {}
+    if args.target in ("rasa", "all"):
+        results["rasa"] = bench_rasa(rasa_url, args.requests, args.concurrency)
+    if args.target in ("actions", "all") and action_url:
+        results["actions"] = bench_actions(action_url, args.requests, args.concurrency)
+    for server in stubs:
+        server.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "live": args.live,
+        "results": results,
+        # Client-side spans, to tell which stage moved when the totals do
+        "stages": get_metrics().snapshot(),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Local stand-ins for the Rasa REST webhook and the custom action server.
+
+Used to benchmark and load-test the chatbot offline. Run standalone with:
+    python benchmarks/stub_rasa.py --port 5005 --delay-ms 5
+    python benchmarks/stub_rasa.py --actions --port 5055
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+class StubRasaHandler(BaseHTTPRequestHandler):
+    """Echoes each message back as a single bot reply, like a minimal REST channel."""
+
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        server = self.server
+        with server.lock:
+            server.hits += 1
+        if server.delay:
+            time.sleep(server.delay)
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self._reply(400, [])
+            return
+        self._reply(200, self.respond(payload))
+
+    def respond(self, payload: Dict):
+        message = payload.get("message", "")
+        return [{"recipient_id": payload.get("sender"), "text": f"echo: {message}"}]
+
+    def _reply(self, status: int, data):
+        out = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def setup(self):
+        super().setup()
+        # Called once per accepted TCP connection, not once per request
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubActionHandler(StubRasaHandler):
+    """Answers rasa_sdk webhook calls the way the language actions in actions/actions.py do."""
+
+    def respond(self, payload: Dict):
+        action = payload.get("next_action")
+        entities: List[Dict] = (payload.get("tracker") or {}).get("latest_message", {}).get("entities", [])
+        language = next((e.get("value") for e in entities if e.get("entity") == "language"), None)
+        if action == "action_set_language" and language:
+            return {
+                "events": [{"event": "slot", "name": "language", "value": language}],
+                "responses": [{"response": "utter_language_set"}, {"response": "utter_greet"}],
+            }
+        if action == "action_ask_language_preference":
+            return {"events": [], "responses": [{"response": "utter_greet"}]}
+        return {"events": [], "responses": [{"response": "utter_ask_language"}]}
+
+
+class StubRasaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], delay: float = 0.0,
+                 handler=StubRasaHandler, path: str = "/webhooks/rest/webhook"):
+        super().__init__(address, handler)
+        self.delay = delay
+        self.path = path
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+
+def _serve(server: StubRasaServer) -> StubRasaServer:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def start_stub(port: int = 0, delay: float = 0.0) -> StubRasaServer:
+    """Start a stub webhook on a background thread; port 0 picks a free one."""
+    return _serve(StubRasaServer(("127.0.0.1", port), delay=delay))
+
+
+def start_action_stub(port: int = 0, delay: float = 0.0) -> StubRasaServer:
+    """Start a stub action server on a background thread; port 0 picks a free one."""
+    return _serve(StubRasaServer(("127.0.0.1", port), delay=delay, handler=StubActionHandler, path="/webhook"))
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--actions", action="store_true", help="serve the action server stub instead")
+    args = parser.parse_args(argv)
+    if args.actions:
+        server = StubRasaServer(("127.0.0.1", args.port), delay=args.delay_ms / 1000,
+                                handler=StubActionHandler, path="/webhook")
+    else:
+        server = StubRasaServer(("127.0.0.1", args.port), delay=args.delay_ms / 1000)
+    print(f"Stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
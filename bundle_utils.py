@@ -0,0 +1,48 @@
+"""Helpers shared by the prebuilt bundles (tts_bundle.py, response_index.py).
+
+Kept free of the speech pipeline and instrumentation so that the action
+server can read the response index without importing either.
+"""
+import os
+import re
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+_MARKDOWN = re.compile(r"[*_`#>~]+")
+_URL = re.compile(r"https?://\S+")
+_BULLET = re.compile(r"[•▪●◦]")
+_SYMBOLS = re.compile(r"[\U0001F000-\U0001FAFF\u2600-\u27BF\uFE0F\u200D]")
+_SPACES = re.compile(r"\s+")
+
+
+def clean_for_speech(text: str) -> str:
+    """Strip markdown, emoji, URLs and bullets so only speakable text remains."""
+    text = _URL.sub(" ", text)
+    text = _MARKDOWN.sub(" ", text)
+    text = _BULLET.sub(", ", text)
+    text = _SYMBOLS.sub(" ", text)
+    return _SPACES.sub(" ", text).replace(" ,", ",").strip(" ,")
+
+
+def audio_key(lang: str, text: str) -> str:
+    """Content address of the speech for a piece of reply text."""
+    return hashlib.sha256(f"{lang}\0{clean_for_speech(text)}".encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def staged_file(directory: str, mode: str = "wb", **kwargs):
+    """Yield (file, path) for a uniquely named temporary file in directory.
+
+    Close it and os.replace() it into place inside the block; if the block
+    raises first, the temporary file is removed.
+    """
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".staged-")
+    try:
+        # mkstemp creates the file owner-only; bundles are read by other services
+        os.chmod(tmp, 0o644)
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f, tmp
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,136 @@
+import re
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from conversation_store import ChatMessage, ConversationStore
+from sanitizer import escape_html
+
+# Messages shown per "load earlier" page
+CHAT_PAGE_SIZE = 50
+
+# The only markup bot text may carry into a bubble: **bold**, as in the welcome messages
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+USER_BUBBLE = """<div style="margin: 5px 16% 5px 16%;">
+<div style="background-color: #0066cc; color: white; padding: 10px 15px;
+            border-radius: 15px 15px 5px 15px; text-align: left;">
+    {content}
+    <div style="font-size: 0.7em; opacity: 0.8; margin-top: 5px;">{timestamp}</div>
+</div></div>"""
+
+BOT_BUBBLE = """<div style="display: flex; align-items: flex-start; margin: 5px 16% 5px 0;">
+<div style="width: 16%; flex-shrink: 0;" title="SecureBank Assistant">🏦</div>
+<div style="flex-grow: 1; background-color: #f0f2f6; color: #262730; padding: 10px 15px;
+            border-radius: 15px 15px 15px 5px; border-left: 4px solid #0066cc;">
+    {content}
+    <div style="font-size: 0.7em; opacity: 0.6; margin-top: 5px;">{timestamp}</div>
+</div></div>"""
+
+
+# Page chrome, built once per process rather than on every script rerun
+PAGE_CSS = """<style>
+    .main-header { background: linear-gradient(90deg, #0066cc 0%, #004499 100%);
+                   padding: 1rem 2rem; border-radius: 10px; color: white; text-align: center; margin-bottom: 2rem; }
+    .chat-container { max-height: 60vh; overflow-y: auto; padding: 10px; background-color: #fafafa;
+                      border-radius: 10px; margin-bottom: 1rem; }
+    .language-selector { background-color: #f0f2f6; padding: 10px; border-radius: 5px; margin-bottom: 10px; }
+    .footer {
+        position: relative;
+        bottom: 0;
+        width: 100%;
+        background-color: #004d99;  /* Bank blue */
+        color: white;
+        text-align: center;
+        padding: 15px 0;
+        font-size: 0.9em;
+        border-radius: 8px 8px 0 0;
+    }
+    .footer a {
+        color: #ffcc00;
+        text-decoration: none;
+        margin: 0 10px;
+    }
+    .footer a:hover {
+        text-decoration: underline;
+    }
+</style>"""
+
+HEADER = """<div class="main-header">
+    <h1>🏦 SecureBank Digital Assistant</h1>
+    <p>Your trusted banking companion - Available 24/7</p>
+    <p style="font-size: 0.9em; opacity: 0.8;">{flag} Currently in {language}</p>
+</div>"""
+
+LANGUAGE_INDICATOR = ("<div class='language-selector' style='color:black'>"
+                      "<strong>🌐 Current Language:</strong> {flag} {language}</div>")
+
+LANGUAGE_FLAG = ("<div style='text-align: center; padding: 10px; background-color: #f0f2f6; "
+                 "border-radius: 5px;'>{flag}</div>")
+
+AUTO_SCROLL = """<script>
+var chatDiv = window.parent.document.querySelector('.chat-container');
+if (chatDiv) { chatDiv.scrollTop = chatDiv.scrollHeight; }
+</script>"""
+
+FOOTER = """<div class="footer">
+    <p>🏦 <strong>SecureBank Digital Assistant</strong> — Secure • Reliable • Available 24/7</p>
+    <p>
+        <a href="#">Terms of Service</a> |
+        <a href="#">Privacy Policy</a> |
+        <a href="#">Contact Us</a>
+    </p>
+    <p style="font-size:0.8em;">© 2025 BankOfMaharashtra. All Rights Reserved.</p>
+</div>"""
+
+
+@lru_cache(maxsize=None)
+def header_html(flag: str, language: str) -> str:
+    """Page styles and header for the current language, as one element."""
+    return PAGE_CSS + "\n" + HEADER.format(flag=flag, language=language)
+
+
+@lru_cache(maxsize=None)
+def language_indicator_html(flag: str, language: str) -> str:
+    return LANGUAGE_INDICATOR.format(flag=flag, language=language)
+
+
+@lru_cache(maxsize=None)
+def language_flag_html(flag: str) -> str:
+    return LANGUAGE_FLAG.format(flag=flag)
+
+
+def bot_text_html(text: str) -> str:
+    """Escape a bot reply, keeping its **bold** spans and line breaks."""
+    # Replies and error strings come from Rasa, the FAQ tiers and exception messages;
+    # none of them may inject HTML, and domain texts use literal <...> (e.g. "<acct>")
+    html = _BOLD.sub(r"<strong>\1</strong>", escape_html(text.strip()))
+    return html.replace("\n", "<br>")
+
+
+def message_html(message: ChatMessage) -> str:
+    """HTML for a single chat bubble."""
+    if message.is_user:
+        # User text is shown verbatim, so any markup in it must not reach the page as HTML
+        return USER_BUBBLE.format(content=escape_html(message.content), timestamp=message.timestamp)
+    return BOT_BUBBLE.format(content=bot_text_html(message.content), timestamp=message.timestamp)
+
+
+def cached_message_html(message: ChatMessage, cache: Dict[int, str]) -> str:
+    """HTML for a message, built once per message id."""
+    html = cache.get(message.id)
+    if html is None:
+        html = cache[message.id] = message_html(message)
+    return html
+
+
+def history_html(store: ConversationStore, cache: Dict[int, str], visible: int) -> Tuple[str, int]:
+    """HTML for the newest `visible` messages and the count of older ones left hidden."""
+    page = store.recent(visible)
+    hidden = len(store) - len(page)
+    html = "\n".join(cached_message_html(m, cache) for m in page)
+    # Drop cached bubbles that have scrolled out of the page so the cache stays bounded
+    if page and len(cache) > len(page):
+        oldest = page[0].id
+        for message_id in [k for k in cache if k < oldest]:
+            del cache[message_id]
+    return html, hidden
@@ -1,13 +1,22 @@
 import streamlit as st
-import re
-import json
 import hashlib
-import datetime
-from typing import Dict, List, Optional, Tuple
-import uuid
-import requests
-# import tts  # Removed because the 'tts' module could not be resolved
-import TextToSpeech as ttss
+import time
+from typing import TYPE_CHECKING
+from dedupe import get_deduplicator, message_nonce
+from chat_render import (
+    AUTO_SCROLL, CHAT_PAGE_SIZE, FOOTER, cached_message_html, header_html, history_html,
+    language_flag_html, language_indicator_html, message_html,
+)
+from conversation_store import ChatMessage, ConversationStore
+from session_store import SESSION_TTL_SECONDS, get_session_store, is_session_id, new_session_id
+from instrumentation import get_metrics, span
+from sanitizer import sanitize_input
+from language_detect import detect_language
+from warmup import warm_up
+# The Rasa backend (requests/httpx), the FAQ cache and the event log
+# are imported where first used, after the page has rendered; warm_up() loads them early
+if TYPE_CHECKING:
+    from async_backend import TurnStream
 # Page configuration
 st.set_page_config(
     page_title="SecureBank ChatBot",
@@ -34,6 +43,12 @@ WELCOME_MESSAGES = {
     "Kannada": "👋 **ಸಿಕ್ಯೂರ್‌ಬ್ಯಾಂಕ್‌ಗೆ ಸುಸ್ವಾಗತ!**\n\nನಾನು ನಿಮ್ಮ ಬ್ಯಾಂಕಿಂಗ್ ಸೇವೆಗಳಲ್ಲಿ ಸಹಾಯ ಮಾಡಲು ಇಲ್ಲಿ ಇದ್ದೇನೆ."
 }
 
+# How often the page checks for new replies while a turn is in flight
+REPLY_POLL_SECONDS = 0.2
+# How often the page checks for finished speech, and how long a turn's speech may take
+SPEECH_POLL_SECONDS = 0.5
+SPEECH_MAX_WAIT_SECONDS = 30
+
 def get_default_language():
     """Get the default language (English)."""
     for lang_name, lang_info in LANGUAGES.items():
@@ -45,6 +60,13 @@ def get_language_code(language_name: str) -> str:
     """Get language code from language name."""
     return LANGUAGES.get(language_name, {}).get("code", "en")
 
+def get_language_name(language_code: str) -> str:
+    """Get language name from language code."""
+    for lang_name, lang_info in LANGUAGES.items():
+        if lang_info["code"] == language_code:
+            return lang_name
+    return get_default_language()
+
 def get_language_flag(language_name: str) -> str:
     """Get language flag from language name."""
     return LANGUAGES.get(language_name, {}).get("flag", "🇺🇸")
@@ -54,22 +76,22 @@ def get_welcome_message(language_name: str) -> str:
     return WELCOME_MESSAGES.get(language_name, WELCOME_MESSAGES["English"])
 
 # Security functions
-def sanitize_input(user_input: str) -> str:
-    """Sanitize user input to prevent injection attacks."""
-    if not user_input:
-        return ""
-    sanitized = re.sub(r"[<>\"']", '', user_input)
-    sanitized = re.sub(r'(javascript|script|eval|exec)', '', sanitized, flags=re.IGNORECASE)
-    return sanitized.strip()[:500]
-
 def generate_session_id() -> str:
     """Generate a unique session ID for tracking."""
-    return str(uuid.uuid4())[:8]
+    return new_session_id()
 
 def hash_account_number(account_num: str) -> str:
     """Hash account number for security display."""
     return hashlib.sha256(account_num.encode()).hexdigest()[:8]
 
+def retention_text(seconds: int) -> str:
+    """How long an idle conversation is kept, for the privacy notice."""
+    if seconds >= 86400:
+        days = seconds // 86400
+        return f"{days} day{'s' if days != 1 else ''}"
+    hours = max(1, seconds // 3600)
+    return f"{hours} hour{'s' if hours != 1 else ''}"
+
 # UI Components
 def show_disclaimer():
     with st.expander("🔒 **Security & Privacy Notice** - Please Read Before Continuing", expanded=True):
@@ -77,34 +99,27 @@ def show_disclaimer():
         **IMPORTANT SECURITY INFORMATION:**
         - This is a demonstration chatbot for educational purposes only.
         - Do NOT enter actual account numbers, passwords, or personal information.
-        - All conversations are encrypted in this demo and cleared after session ends.
-        """)
+        - Conversations are stored on the demo server, unencrypted, and deleted after
+          {retention} without activity.
+        - Anyone with this page's link can resume the conversation; do not share it.
+          The demo login is not saved and must be repeated after a reload.
+        """.format(retention=retention_text(SESSION_TTL_SECONDS)))
 
-def render_message(message: Dict, is_user: bool = False):
+def render_message(message: ChatMessage):
     """Render a chat message with styling."""
-    if is_user:
-        col1, col2, col3 = st.columns([1, 4, 1])
-        with col2:
-            st.markdown(f"""
-            <div style="background-color: #0066cc; color: white; padding: 10px 15px;
-                        border-radius: 15px 15px 5px 15px; margin: 5px 0; text-align: left;">
-                {message['content']}
-                <div style="font-size: 0.7em; opacity: 0.8; margin-top: 5px;">{message['timestamp']}</div>
-            </div>
-            """, unsafe_allow_html=True)
-    else:
-        col1, col2, col3 = st.columns([1, 4, 1])
-        with col1:
-            st.markdown("🏦", help="SecureBank Assistant")
-        with col2:
-            st.markdown(f"""
-            <div style="background-color: #f0f2f6; color: #262730; padding: 10px 15px;
-                        border-radius: 15px 15px 15px 5px; margin: 5px 0;
-                        border-left: 4px solid #0066cc;">
-                {message['content']}
-                <div style="font-size: 0.7em; opacity: 0.6; margin-top: 5px;">{message['timestamp']}</div>
-            </div>
-            """, unsafe_allow_html=True)
+    st.markdown(cached_message_html(message, st.session_state.html_cache), unsafe_allow_html=True)
+
+def render_history():
+    """Render the newest page of history as one element, with older pages on demand."""
+    visible = st.session_state.get('history_visible', CHAT_PAGE_SIZE)
+    html, hidden = history_html(st.session_state.messages, st.session_state.html_cache, visible)
+    if hidden:
+        st.button(f"⬆️ Load earlier messages ({hidden} more)", on_click=load_earlier_messages)
+    st.markdown(html, unsafe_allow_html=True)
+
+def load_earlier_messages():
+    """Show one more page of older messages."""
+    st.session_state.history_visible = st.session_state.get('history_visible', CHAT_PAGE_SIZE) + CHAT_PAGE_SIZE
 
 def authenticate_demo_account():
     st.sidebar.markdown("### 🔐 Demo Authentication")
@@ -132,130 +147,212 @@ def authenticate_demo_account():
             st.rerun()
 
 # NEW: Rasa API call
-def send_to_rasa(user_message: str, language: str = "English") -> List[str]:
-    """Send the message to Rasa REST API and return list of bot replies."""
+def send_to_rasa(user_message: str, language: str = "English") -> "TurnStream":
+    """Dispatch the message to Rasa without blocking and return a stream of its replies."""
+    from async_backend import get_backend
+    from faq_cache import get_faq_cache
     session_id = st.session_state.get('session_id', generate_session_id())
     st.session_state.session_id = session_id
-    try:
-        # Get language code
-        language_code = get_language_code(language)
-        
-        # Create payload with language information
-        payload = {
-            "sender": session_id, 
-            "message": user_message,
-            "metadata": {
-                "language": language_code,
-                "language_name": language
-            }
-        }
-        
-        resp = requests.post(
-            "http://0.0.0.0:5005/webhooks/rest/webhook",
-            json=payload, timeout=10
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            replies = [m.get("text", "") for m in data if m.get("text")]
-            return replies
-        else:
-            return ["❌ Error: Unable to connect to Rasa server."]
-    except requests.RequestException as e:
-        return [f"❌ Connection error: {e}"]
+    # Get language code
+    language_code = get_language_code(language)
+
+    # Repeated FAQ questions can be answered without a round-trip to Rasa
+    faq_cache = get_faq_cache()
+    if faq_cache is not None:
+        cached = faq_cache.get(user_message, language_code)
+        if cached is not None:
+            return get_backend().replay_turn(session_id, user_message, language_code, cached)
+    
+    # Create payload with language information
+    metadata = {
+        "language": language_code,
+        "language_name": language
+    }
+    return get_backend().submit_turn(session_id, user_message, metadata)
 
 def send_message():
     """Send message and get response from Rasa."""
     if 'user_input' not in st.session_state or not st.session_state.user_input.strip():
         return
     
-    user_message = sanitize_input(st.session_state.user_input.strip())
+    session_id = st.session_state.get('session_id', generate_session_id())
+    st.session_state.session_id = session_id
+    with span("sanitize_input", session_id):
+        user_message = sanitize_input(st.session_state.user_input)
     if not user_message:
         st.error("Invalid input. Please enter a valid message.")
         return
+
+    # Enter (on_change) and the Send button can both fire for one submission;
+    # only the first caller for this nonce gets to dispatch it.
+    input_counter = st.session_state.get('input_counter', 0)
+    if not get_deduplicator().claim(session_id, message_nonce(input_counter, user_message)):
+        return
     
     # Get selected language (default to English if not set)
     selected_language = st.session_state.get('selected_language', get_default_language())
+    # Follow the script the user is typing in; Rasa picks it up from the metadata,
+    # so no set_language turn is needed
+    selected_code = get_language_code(selected_language)
+    detected_code = detect_language(user_message, current=selected_code)
+    if detected_code is not None and detected_code != selected_code:
+        selected_language = get_language_name(detected_code)
+        st.session_state.selected_language = selected_language
+        handle_language_change(selected_language)
     
-    st.session_state.messages.append({
-        'content': user_message,
-        'timestamp': datetime.datetime.now().strftime('%I:%M %p'),
-        'is_user': True
-    })
+    # The last turn's clips have played; drop them so they are not rendered again
+    st.session_state.pop('tts_clips', None)
     
-    # Get Rasa responses with language information
-    replies = send_to_rasa(user_message, selected_language)
-    replies = send_to_rasa(user_message, selected_language)
-    for reply in replies:
-
-        st.session_state.messages.append({
-            'content': reply,
-            'timestamp': datetime.datetime.now().strftime('%I:%M %p'),
-            'is_user': False
-        })
-    print(replies)
-    ttss.some(str(replies))
-    # tts.some(replies)  # Removed because the 'tts' module could not be resolved
-    # Clear the text field by setting user_input to empty string
-    def send_message():
-        # your send message logic here
-        # ...
-        st.session_state.user_input = ""  # REMOVE THIS LINE
-
-        def clear_input():
-            st.session_state.user_input = ""
-
-        st.text_input(
-            "Message",
-            key="user_input",
-            on_change=send_message  # This will call send_message when user presses Enter
-        )
+    # Dispatched by stream_replies() once the turn before it has finished, so a
+    # new submission never cuts off replies that are still arriving
+    st.session_state.setdefault('queued_turns', []).append((user_message, selected_language))
+    # Clear the text field; allowed here because send_message only runs as a widget callback
+    st.session_state.user_input = ""
+
+
+def turn_pending() -> bool:
+    return 'pending_turn' in st.session_state or bool(st.session_state.get('queued_turns'))
+
+def finish_turn(turn: "TurnStream", session_id: str):
+    """Record a turn whose last reply has arrived."""
+    from analytics import detect_intent, get_event_log
+    from faq_cache import get_faq_cache
+    # End-to-end time from dispatch until the last reply arrived
+    get_metrics().observe("turn", turn.latency_ms / 1000, session_id)
+
+    faq_cache = get_faq_cache()
+    if faq_cache is not None and not turn.cached:
+        faq_cache.put(turn.message, turn.lang, turn.replies)
+    get_event_log().record(session_id, turn.lang, detect_intent(turn.replies), turn.latency_ms)
+    # Speech was queued reply by reply in the background; play_speech() plays it once ready
+    if turn.speech is not None:
+        st.session_state.setdefault('tts_jobs', []).append((turn.speech, time.monotonic()))
+
+def stream_replies():
+    """Append the replies of the turn in flight as they arrive, then dispatch the next queued turn.
+
+    Runs as a fragment polled while a turn is pending, so each poll only waits
+    for what has already arrived and the rest of the page stays interactive.
+    """
+    messages = st.session_state.messages
+    queued = st.session_state.get('queued_turns', [])
+    finished = False
+    while True:
+        pending_turn = st.session_state.get('pending_turn')
+        if pending_turn is None:
+            if not queued:
+                break
+            user_message, language = queued.pop(0)
+            messages.append(user_message, is_user=True)
+            pending_turn = st.session_state.pending_turn = send_to_rasa(user_message, language)
+        for reply in pending_turn.poll():
+            messages.append(reply, is_user=False)
+        if not pending_turn.finished:
+            break
+        del st.session_state['pending_turn']
+        finish_turn(pending_turn, st.session_state.session_id)
+        finished = True
+
+    # Everything appended since the last full run; the history shows the rest
+    session_id = st.session_state.get('session_id')
+    for message in messages.recent(len(messages) - st.session_state.rendered_messages):
+        with span("render_reply", session_id):
+            render_message(message)
+    for user_message, _ in queued:
+        st.markdown(message_html(ChatMessage(-1, user_message, time.time(), is_user=True)),
+                    unsafe_allow_html=True)
+    if finished and not turn_pending():
+        # A full run saves the turns and stops the polling
+        st.rerun()
+
+
+def speech_pending() -> bool:
+    return bool(st.session_state.get('tts_jobs'))
+
+def play_speech():
+    """Play the speech of finished turns in order; unfinished jobs stay queued for the next poll."""
+    jobs = st.session_state.get('tts_jobs', [])
+    clips = []
+    popped = False
+    while jobs:
+        job, queued_at = jobs[0]
+        if not job.done():
+            if time.monotonic() - queued_at < SPEECH_MAX_WAIT_SECONDS:
+                break
+            # Give up on speech that is stuck rather than poll forever
+            job.cancel()
+        clips += job.results()
+        jobs.pop(0)
+        popped = True
+    if clips:
+        st.session_state.tts_clips = clips
+    # Re-rendered on every poll so the clips keep their place and are not played again
+    for audio in st.session_state.get('tts_clips', []):
+        st.audio(audio, format="audio/mp3", autoplay=True)
+    if not jobs and popped:
+        # Every job has finished, with or without audio (legacy backend, failed or
+        # cancelled synthesis); a full run stops the polling
+        st.rerun()
 
 
 def handle_language_change(new_language: str):
     """Handle language change and update welcome message if needed."""
     if 'messages' in st.session_state and st.session_state.messages:
         # Update the first message (welcome message) if it exists
-        if len(st.session_state.messages) == 1 and not st.session_state.messages[0].get('is_user', False):
-            st.session_state.messages[0]['content'] = get_welcome_message(new_language)
-            st.session_state.messages[0]['timestamp'] = datetime.datetime.now().strftime('%I:%M %p')
+        welcome = st.session_state.messages.first()
+        if len(st.session_state.messages) == 1 and welcome is not None and not welcome.is_user:
+            welcome.content = get_welcome_message(new_language)
+            welcome.created = time.time()
+            st.session_state.messages.update(welcome)
+            st.session_state.html_cache.pop(welcome.id, None)
+
+# Session state that must survive this process, so any chatbot instance can resume the session.
+# The demo login is deliberately not among them: the ?sid= link would then act as a
+# bearer token for the account, and links get shared, bookmarked and logged.
+PERSISTED_KEYS = ('selected_language', 'session_id')
+
+def init_session():
+    """Resume the session named in the URL from the shared store, or start a new one."""
+    conversation_id = st.query_params.get("sid")
+    state = get_session_store().load_state(conversation_id) if is_session_id(conversation_id) else None
+    # Rendered bubble HTML per message id, so each message is formatted once
+    st.session_state.html_cache = {}
+    if state is not None:
+        for key in PERSISTED_KEYS:
+            if key in state:
+                st.session_state[key] = state[key]
+        st.session_state.messages = ConversationStore.resume(conversation_id)
+    else:
+        language = st.session_state.get('selected_language', get_default_language())
+        st.session_state.messages = ConversationStore(conversation_id=new_session_id())
+        st.session_state.messages.append(get_welcome_message(language), is_user=False)
+        st.query_params["sid"] = st.session_state.messages.conversation_id
+    st.session_state.saved_state = state
+
+def persist_session():
+    """Write new turns and any changed session state to the shared store."""
+    flushed = st.session_state.messages.flush()
+    state = {key: st.session_state[key] for key in PERSISTED_KEYS if key in st.session_state}
+    # Saving also refreshes the session's expiry, so do it on activity too
+    if flushed or state != st.session_state.saved_state:
+        get_session_store().save_state(st.session_state.messages.conversation_id, state)
+        st.session_state.saved_state = state
 
 # Main App
 def main():
-    # CSS
-    st.markdown("""
-    <style>
-        .main-header { background: linear-gradient(90deg, #0066cc 0%, #004499 100%);
-                       padding: 1rem 2rem; border-radius: 10px; color: white; text-align: center; margin-bottom: 2rem; }
-        .chat-container { max-height: 60vh; overflow-y: auto; padding: 10px; background-color: #fafafa;
-                          border-radius: 10px; margin-bottom: 1rem; }
-        .language-selector { background-color: #f0f2f6; padding: 10px; border-radius: 5px; margin-bottom: 10px; }
-    </style>
-    """, unsafe_allow_html=True)
+    # Init chat history, resuming a session started on another instance if the URL names one
+    if 'messages' not in st.session_state:
+        init_session()
 
     # Initialize language selection
     if 'selected_language' not in st.session_state:
         st.session_state.selected_language = get_default_language()
 
-    # Header
+    # CSS and header
     current_language = st.session_state.selected_language
-    language_flag = get_language_flag(current_language)
-    st.markdown(f'''
-    <div class="main-header">
-        <h1>🏦 SecureBank Digital Assistant</h1>
-        <p>Your trusted banking companion - Available 24/7</p>
-        <p style="font-size: 0.9em; opacity: 0.8;">{language_flag} Currently in {current_language}</p>
-    </div>
-    ''', unsafe_allow_html=True)
+    st.markdown(header_html(get_language_flag(current_language), current_language), unsafe_allow_html=True)
     show_disclaimer()
 
-    # Init chat history
-    if 'messages' not in st.session_state:
-        st.session_state.messages = [{
-            'content': get_welcome_message(st.session_state.selected_language),
-            'timestamp': datetime.datetime.now().strftime('%I:%M %p'),
-            'is_user': False
-        }]
-
     # Sidebar authentication and language selection
     authenticate_demo_account()
     
@@ -277,13 +374,24 @@ def main():
 
     # Display messages
     chat_container = st.container()
+    with chat_container, span("render_history", st.session_state.get('session_id')):
+        render_history()
+    st.session_state.rendered_messages = len(st.session_state.messages)
+    # Stream replies in, polling only while a turn is in flight or queued
     with chat_container:
-        for m in st.session_state.messages:
-            render_message(m, m['is_user'])
+        st.fragment(run_every=REPLY_POLL_SECONDS if turn_pending() else None)(stream_replies)()
+    persist_session()
+
+    # Play speech once the background workers have finished it, polling only while some is pending
+    st.fragment(run_every=SPEECH_POLL_SECONDS if speech_pending() else None)(play_speech)()
 
     # Input field with language indicator and send button
-    st.markdown(f"<div class='language-selector' style='color:black'><strong>🌐 Current Language:</strong> {get_language_flag(st.session_state.selected_language)} {st.session_state.selected_language}</div>", unsafe_allow_html=True)
+    st.markdown(language_indicator_html(get_language_flag(st.session_state.selected_language),
+                                        st.session_state.selected_language), unsafe_allow_html=True)
     
+    # Callbacks fired by one interaction all run before this script pass, so they
+    # share a counter value; the next interaction sees a new one.
+    st.session_state.input_counter = st.session_state.get('input_counter', 0) + 1
     col1, col2, col3 = st.columns([5, 1, 1])
     with col1:
         st.text_input(
@@ -294,59 +402,19 @@ def main():
             on_change=send_message
         )
     with col2:
-        if st.button("Send 📤", use_container_width=True):
-            send_message()
-            st.rerun()
+        st.button("Send 📤", use_container_width=True, on_click=send_message)
     with col3:
         # Show current language flag
-        st.markdown(f"<div style='text-align: center; padding: 10px; background-color: #f0f2f6; border-radius: 5px;'>{get_language_flag(st.session_state.selected_language)}</div>", unsafe_allow_html=True)
+        st.markdown(language_flag_html(get_language_flag(st.session_state.selected_language)), unsafe_allow_html=True)
 
     # Auto-scroll (move to bottom)
-    st.markdown("""
-        <script>
-        var chatDiv = window.parent.document.querySelector('.chat-container');
-        if (chatDiv) { chatDiv.scrollTop = chatDiv.scrollHeight; }
-        </script>
-    """, unsafe_allow_html=True)
+    st.markdown(AUTO_SCROLL, unsafe_allow_html=True)
 
     # Footer
-    # st.markdown("---")
-    # st.markdown('<div style="text-align: center; color: #666; font-size: 0.9em;">🏦 SecureBank Digital Assistant | Secure • Reliable • Available 24/7</div>', unsafe_allow_html=True)
+    st.markdown(FOOTER, unsafe_allow_html=True)
 
-    # Footer
-    st.markdown("""
-    <style>
-    .footer {
-        position: relative;
-        bottom: 0;
-        width: 100%;
-        background-color: #004d99;  /* Bank blue */
-        color: white;
-        text-align: center;
-        padding: 15px 0;
-        font-size: 0.9em;
-        border-radius: 8px 8px 0 0;
-    }
-    .footer a {
-        color: #ffcc00;
-        text-decoration: none;
-        margin: 0 10px;
-    }
-    .footer a:hover {
-        text-decoration: underline;
-    }
-    </style>
-
-    <div class="footer">
-        <p>🏦 <strong>SecureBank Digital Assistant</strong> — Secure • Reliable • Available 24/7</p>
-        <p>
-            <a href="#">Terms of Service</a> | 
-            <a href="#">Privacy Policy</a> | 
-            <a href="#">Contact Us</a>
-        </p>
-        <p style="font-size:0.8em;">© 2025 BankOfMaharashtra. All Rights Reserved.</p>
-    </div>
-    """, unsafe_allow_html=True)
+    # Pre-initialize the backend and caches once per process, after the first render
+    warm_up()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import datetime
+from collections import deque
+from typing import Deque, List, Optional
+
+from session_store import LATEST, MessageRow, SessionStore, get_session_store, new_session_id
+
+# Turns kept in memory per session; older ones are read back from the session store
+CHAT_MEMORY_TURNS = int(os.environ.get("CHAT_MEMORY_TURNS", "200"))
+# Evict from memory in batches rather than on every turn past the limit
+CHAT_SPILL_BATCH = 50
+# Message ids reserved from the session store at a time; unused ones are simply skipped
+CHAT_ID_BLOCK = 64
+
+
+class ChatMessage:
+    """One chat turn; slotted so a long history costs no per-instance dict."""
+
+    __slots__ = ("id", "content", "created", "is_user")
+
+    def __init__(self, id: int, content: str, created: float, is_user: bool):
+        self.id = id
+        self.content = content
+        self.created = created
+        self.is_user = is_user
+
+    @property
+    def timestamp(self) -> str:
+        """Display time, formatted on demand from the epoch timestamp."""
+        return datetime.datetime.fromtimestamp(self.created).strftime('%I:%M %p')
+
+
+def _to_row(message: ChatMessage) -> MessageRow:
+    return message.id, message.created, message.is_user, message.content
+
+
+def _from_rows(rows: List[MessageRow]) -> List[ChatMessage]:
+    return [ChatMessage(i, content, created, is_user) for i, created, is_user, content in rows]
+
+
+class ConversationStore:
+    """Bounded chat history: a ring buffer of recent turns over the shared session store."""
+
+    def __init__(self, max_in_memory: int = CHAT_MEMORY_TURNS, conversation_id: Optional[str] = None,
+                 backend: Optional[SessionStore] = None):
+        self.max_in_memory = max_in_memory
+        self.conversation_id = conversation_id or new_session_id()
+        self.backend = backend if backend is not None else get_session_store()
+        self._recent: Deque[ChatMessage] = deque()
+        # Appended but not yet written to the session store
+        self._unsaved: List[ChatMessage] = []
+        # Reserved ids not yet used: [_next_id, _end_id)
+        self._next_id = self._end_id = 0
+        self.spilled = 0
+
+    @classmethod
+    def resume(cls, conversation_id: str, max_in_memory: int = CHAT_MEMORY_TURNS,
+               backend: Optional[SessionStore] = None) -> "ConversationStore":
+        """Reopen a conversation saved by this or any other process."""
+        store = cls(max_in_memory, conversation_id, backend)
+        count = store.backend.message_count(conversation_id)
+        store._recent.extend(_from_rows(store.backend.load_messages(conversation_id, LATEST, max_in_memory)))
+        store.spilled = count - len(store._recent)
+        return store
+
+    def append(self, content: str, is_user: bool) -> ChatMessage:
+        message = ChatMessage(self._new_id(), content, time.time(), is_user)
+        self._recent.append(message)
+        self._unsaved.append(message)
+        if len(self._recent) > self.max_in_memory + CHAT_SPILL_BATCH:
+            self.flush()
+            count = len(self._recent) - self.max_in_memory
+            for _ in range(count):
+                self._recent.popleft()
+            self.spilled += count
+        return message
+
+    def _new_id(self) -> int:
+        # Ids come from blocks reserved in the store, so another tab on this session never
+        # reuses one, and only one append in CHAT_ID_BLOCK waits on the store. Messages from
+        # tabs open at the same time are ordered by block, not strictly by time.
+        if self._next_id == self._end_id:
+            self._next_id = self.backend.reserve_message_ids(self.conversation_id, CHAT_ID_BLOCK)
+            self._end_id = self._next_id + CHAT_ID_BLOCK
+        self._next_id += 1
+        return self._next_id - 1
+
+    def flush(self) -> bool:
+        """Write the turns appended since the last flush to the session store."""
+        if not self._unsaved:
+            return False
+        self.backend.append_messages(self.conversation_id, [_to_row(m) for m in self._unsaved])
+        self._unsaved = []
+        return True
+
+    def update(self, message: ChatMessage):
+        """Persist an in-place edit of an already appended message."""
+        if message not in self._unsaved:
+            self.backend.update_message(self.conversation_id, _to_row(message))
+
+    def _load_spilled(self, count: int) -> List[ChatMessage]:
+        """The newest `count` turns no longer held in memory, oldest first."""
+        # Ids can have gaps (allocated by another tab, not yet flushed), so page by id, not by count
+        before_id = self._recent[0].id if self._recent else LATEST
+        return _from_rows(self.backend.load_messages(self.conversation_id, before_id, count))
+
+    def recent(self, count: int) -> List[ChatMessage]:
+        """The newest `count` turns, oldest first, reading spilled turns back if needed."""
+        in_memory = list(self._recent)[max(0, len(self._recent) - count):]
+        missing = count - len(in_memory)
+        if missing > 0 and self.spilled:
+            return self._load_spilled(missing) + in_memory
+        return in_memory
+
+    def first(self) -> Optional[ChatMessage]:
+        """The opening turn, if it is still held in memory."""
+        if self._recent and self._recent[0].id == 0:
+            return self._recent[0]
+        return None
+
+    def __len__(self) -> int:
+        return self.spilled + len(self._recent)
+
+    def memory_bytes(self) -> int:
+        """Approximate in-memory footprint of the held turns."""
+        size = sys.getsizeof(self._recent)
+        for m in self._recent:
+            size += sys.getsizeof(m) + sys.getsizeof(m.content)
+        return size
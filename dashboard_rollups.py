@@ -0,0 +1,69 @@
+import os
+import sqlite3
+from typing import Dict
+
+import pandas as pd
+
+from analytics import ANALYTICS_DB, BUSY_TIMEOUT_SECONDS, LANGUAGE_NAMES
+
+# Dashboard data is recomputed at most this often per process
+ROLLUP_TTL_SECONDS = 30
+# Target for load_rollups + build_views, independent of raw event volume;
+# benchmarks/check_dashboard.py fails when it is exceeded
+DASHBOARD_BUDGET_MS = 500
+COLUMNS = ["hour", "lang", "intent", "count", "latency_sum"]
+
+
+def topic_label(intent: str) -> str:
+    return intent.replace("ask_", "", 1).replace("_", " ").title()
+
+
+def load_rollups(path: str = ANALYTICS_DB) -> pd.DataFrame:
+    """Hourly rollups as a compact frame with categorical language and topic columns.
+
+    Read-only: the event writer (analytics.EventLog) keeps the rollups current,
+    so a dashboard reload never takes a write lock on the chatbot's database.
+    """
+    if not os.path.exists(path):
+        rows = []
+    else:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM rollups").fetchall()
+        except sqlite3.OperationalError as e:
+            # Created but never written to by the chatbot yet
+            if "no such table" not in str(e):
+                raise
+            rows = []
+        finally:
+            conn.close()
+    df = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    df["hour"] = pd.to_datetime(df["hour"] * 3600, unit="s")
+    # Categorize first so labels are computed once per distinct value, not per row
+    df["language"] = df.pop("lang").astype("category").cat.rename_categories(
+        lambda code: LANGUAGE_NAMES.get(code, code)
+    )
+    df["topic"] = df.pop("intent").astype("category").cat.rename_categories(topic_label)
+    df["count"] = df["count"].astype("int64")
+    return df
+
+
+def build_views(df: pd.DataFrame) -> Dict:
+    """KPIs and chart-ready frames for the dashboard, all derived from the rollups."""
+    total = int(df["count"].sum())
+    if not total:
+        return {"total": 0}
+    by_language = (
+        df.groupby("language", observed=True)["count"].sum().sort_values(ascending=False)
+    )
+    by_topic = df.groupby("topic", observed=True)["count"].sum().sort_values(ascending=False)
+    daily = df.groupby(df["hour"].dt.floor("D"))["count"].sum()
+    return {
+        "total": total,
+        "unique_languages": int((by_language > 0).sum()),
+        "top_language": str(by_language.index[0]),
+        "mean_latency_ms": float(df["latency_sum"].sum() / total),
+        "lang_counts": by_language.rename_axis("Language").reset_index(name="Count"),
+        "topic_counts": by_topic.rename_axis("Topic").reset_index(name="Count"),
+        "daily": daily.rename_axis("date").reset_index(name="Count"),
+    }
@@ -0,0 +1,56 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+DEDUPE_TTL_SECONDS = 30.0
+DEDUPE_MAX_KEYS = 10000
+
+
+def message_nonce(input_counter: int, message: str) -> str:
+    """Build the nonce for one submission of the input box.
+
+    The counter is bumped once per script run, so the Enter-key callback and
+    the Send button firing for the same submission share a nonce while
+    re-sending the same text in a later interaction is a new request.
+    """
+    digest = hashlib.sha1(message.encode("utf-8")).hexdigest()[:12]
+    return f"{input_counter}:{digest}"
+
+
+class RequestDeduplicator:
+    """Process-wide record of (session id, nonce) pairs already dispatched."""
+
+    def __init__(self, ttl: float = DEDUPE_TTL_SECONDS, max_keys: int = DEDUPE_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._seen: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, session_id: str, nonce: str) -> bool:
+        """Return True the first time a key is seen, False for any repeat."""
+        key = (session_id, nonce)
+        now = time.monotonic()
+        with self._lock:
+            # Entries are stored in insertion order, so expired ones are at the front
+            while self._seen:
+                oldest_key, stamp = next(iter(self._seen.items()))
+                if now - stamp < self.ttl and len(self._seen) < self.max_keys:
+                    break
+                self._seen.popitem(last=False)
+            if key in self._seen:
+                return False
+            self._seen[key] = now
+            return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+_deduplicator = RequestDeduplicator()
+
+
+def get_deduplicator() -> RequestDeduplicator:
+    """Return the deduplicator shared by every Streamlit session."""
+    return _deduplicator
@@ -0,0 +1,124 @@
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DOMAIN_PATH = os.environ.get("DOMAIN_PATH", os.path.join(BASE_DIR, "domain.yml"))
+NLU_PATH = os.environ.get("NLU_PATH", os.path.join(BASE_DIR, "nlu.yml"))
+RULES_PATH = os.environ.get("RULES_PATH", os.path.join(BASE_DIR, "rules.yml"))
+STORIES_PATH = os.environ.get("STORIES_PATH", os.path.join(BASE_DIR, "stories.yml"))
+CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(BASE_DIR, "config.yml"))
+ENDPOINTS_PATH = os.environ.get("ENDPOINTS_PATH", os.path.join(BASE_DIR, "endpoints.yml"))
+
+# "[English](language)" -> "English"
+_ENTITY_ANNOTATION = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+# "[English](language)" -> "language"; "(language:en)" carries a synonym value
+_ENTITY_NAME = re.compile(r"\[[^\]]+\]\(([^):]*)")
+
+# Variants without a language condition are the English fallback
+DEFAULT_LANGUAGE = "en"
+
+
+def _load_yaml(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def iter_response_variants(domain_path: str = DOMAIN_PATH) -> Iterator[Tuple[str, Optional[str], str]]:
+    """Yield (response name, language code or None if unconditioned, text) in domain order."""
+    domain = _load_yaml(domain_path)
+    for name, variants in (domain.get("responses") or {}).items():
+        for variant in variants or []:
+            text = variant.get("text")
+            if not text:
+                continue
+            lang = None
+            for cond in variant.get("condition") or []:
+                if cond.get("type") == "slot" and cond.get("name") == "language":
+                    lang = str(cond.get("value"))
+            yield name, lang, text
+
+
+def iter_domain_responses(domain_path: str = DOMAIN_PATH) -> Iterator[Tuple[str, str, str]]:
+    """Yield (response name, language code, text) for every text variant in the domain."""
+    for name, lang, text in iter_response_variants(domain_path):
+        yield name, lang or DEFAULT_LANGUAGE, text
+
+
+def load_rules(rules_path: str = RULES_PATH) -> List[Dict]:
+    """The rule entries of a rules file."""
+    return _load_yaml(rules_path).get("rules") or []
+
+
+def load_stateless_rules(rules_path: str = RULES_PATH) -> Dict[str, str]:
+    """Map intent -> utter_* response for rules that only answer one intent.
+
+    A rule counts as stateless when it has no conditions and its steps are
+    exactly one intent followed by one templated response, so its answer
+    depends on nothing but the message and the language slot.
+    """
+    stateless = {}
+    for rule in load_rules(rules_path):
+        if rule.get("condition") or rule.get("conversation_start"):
+            continue
+        steps = rule.get("steps") or []
+        if len(steps) != 2:
+            continue
+        intent, action = steps[0].get("intent"), steps[1].get("action")
+        if intent and action and action.startswith("utter_"):
+            stateless[intent] = action
+    return stateless
+
+
+def load_reply_intents(domain_path: str = DOMAIN_PATH, rules_path: str = RULES_PATH) -> Dict[str, str]:
+    """Map each templated reply text (any language) back to the intent whose rule utters it.
+
+    The REST webhook only returns reply text, so this is how the app tells
+    which intent Rasa detected for rule-driven turns.
+    """
+    intent_for_response = {}
+    for rule in load_rules(rules_path):
+        steps = rule.get("steps") or []
+        for step, following in zip(steps, steps[1:]):
+            intent, action = step.get("intent"), following.get("action")
+            if intent and action and action.startswith("utter_"):
+                intent_for_response.setdefault(action, intent)
+    return {
+        text.strip(): intent_for_response[name]
+        for name, _, text in iter_domain_responses(domain_path)
+        if name in intent_for_response
+    }
+
+
+def load_nlu_examples(nlu_path: str = NLU_PATH) -> List[Tuple[str, str]]:
+    """(intent, example text) pairs from the NLU data, with entity markup removed."""
+    examples = []
+    for block in _load_yaml(nlu_path).get("nlu") or []:
+        intent = block.get("intent")
+        if not intent:
+            continue
+        for line in (block.get("examples") or "").splitlines():
+            line = line.strip()
+            if line.startswith("- "):
+                examples.append((intent, _ENTITY_ANNOTATION.sub(r"\1", line[2:].strip())))
+    return examples
+
+
+def load_nlu_labels(nlu_path: str = NLU_PATH) -> Tuple[List[str], List[str]]:
+    """Sorted intent and entity names used in the NLU data."""
+    intents, entities = set(), set()
+    for block in _load_yaml(nlu_path).get("nlu") or []:
+        intent = block.get("intent")
+        if not intent:
+            continue
+        intents.add(intent)
+        entities.update(_ENTITY_NAME.findall(block.get("examples") or ""))
+    return sorted(intents), sorted(entities)
+
+
+def load_action_endpoint(endpoints_path: str = ENDPOINTS_PATH) -> Optional[str]:
+    """URL of the custom action server from endpoints.yml, if configured."""
+    endpoint = _load_yaml(endpoints_path).get("action_endpoint") or {}
+    return endpoint.get("url")
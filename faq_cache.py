@@ -0,0 +1,125 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from domain_data import DOMAIN_PATH, NLU_PATH, RULES_PATH, iter_domain_responses, load_stateless_rules
+from sanitizer import cache_key
+
+# Cache configuration; the cache is opt-in because it bypasses the Rasa tracker
+FAQ_CACHE_ENABLED = os.environ.get("FAQ_CACHE_ENABLED", "0").lower() in ("1", "true", "yes")
+FAQ_CACHE_SIZE = int(os.environ.get("FAQ_CACHE_SIZE", "2048"))
+FAQ_CACHE_TTL = float(os.environ.get("FAQ_CACHE_TTL", "3600"))
+# How often the data files are re-stat'ed for changes
+FAQ_CACHE_CHECK_INTERVAL = 5.0
+
+
+def data_fingerprint(paths: Tuple[str, ...]) -> str:
+    """Hash of the training/domain files whose change must invalidate the cache."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class FAQCache:
+    """TTL/LRU cache of FAQ replies keyed on (normalized message, language code).
+
+    Only replies that are exactly the domain text of a stateless rule's
+    response in the requested language are ever stored, so anything that
+    depends on tracker state keeps going to Rasa.
+    """
+
+    def __init__(self, max_entries: int = FAQ_CACHE_SIZE, ttl: float = FAQ_CACHE_TTL,
+                 domain_path: str = DOMAIN_PATH, nlu_path: str = NLU_PATH, rules_path: str = RULES_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.domain_path = domain_path
+        self.rules_path = rules_path
+        self._paths = (domain_path, nlu_path, rules_path)
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats_key: Tuple = ()
+        self._next_check = 0.0
+        self.fingerprint = ""
+        self.cacheable: Set[Tuple[str, str]] = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._reload()
+
+    def _file_stats(self) -> Tuple:
+        return tuple((os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in self._paths)
+
+    def _reload(self):
+        """Rebuild the set of cacheable replies from the current data files."""
+        stateless = set(load_stateless_rules(self.rules_path).values())
+        self.cacheable = {
+            (lang, text.strip())
+            for name, lang, text in iter_domain_responses(self.domain_path)
+            if name in stateless
+        }
+        self._stats_key = self._file_stats()
+        self.fingerprint = data_fingerprint(self._paths)
+
+    def _check_fresh(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + FAQ_CACHE_CHECK_INTERVAL
+        if self._file_stats() == self._stats_key:
+            return
+        old = self.fingerprint
+        self._reload()
+        if self.fingerprint != old:
+            self._data.clear()
+            self.invalidations += 1
+
+    def get(self, message: str, lang: str) -> Optional[List[str]]:
+        key = (cache_key(message), lang)
+        with self._lock:
+            self._check_fresh()
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, message: str, lang: str, replies: List[str]) -> bool:
+        """Store a reply if it is a stateless FAQ answer in this language."""
+        if len(replies) != 1 or (lang, replies[0].strip()) not in self.cacheable:
+            return False
+        key = (cache_key(message), lang)
+        with self._lock:
+            self._data[key] = (time.monotonic(), list(replies))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses,
+                "invalidations": self.invalidations}
+
+
+_cache: Optional[FAQCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_faq_cache() -> Optional[FAQCache]:
+    """Return the process-wide FAQ cache, or None when it is not enabled."""
+    global _cache
+    if not FAQ_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FAQCache()
+    return _cache
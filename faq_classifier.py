@@ -0,0 +1,261 @@
+"""In-process FAQ intent classifier for stateless FAQs, evaluated offline.
+
+Character n-gram TF-IDF vectors of the nlu.yml examples are averaged into
+centroids per intent and script. A message is scored against every centroid
+with a single sparse dot product; when the best intent is answered by a
+stateless rule and beats that intent's threshold and runner-up margin, its
+domain.yml response for the active language is returned without calling
+Rasa. Anything else falls through.
+
+The per-intent limits are calibrated on leave-one-out predictions over
+nlu.yml to FAQ_CLASSIFIER_TARGET_PRECISION; an intent that cannot reach the
+target at any limit is always left to Rasa.
+
+It is not on the chat send path: on the current nlu.yml the calibrated
+limits answer under 2% of FAQ examples (benchmarks/bench_faq_classifier.py),
+which does not pay for importing NumPy into the app. replay.py's stub mode
+uses it as a stand-in for Rasa NLU.
+
+Prebuild the index with:  python faq_classifier.py --build
+"""
+import os
+import math
+import argparse
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from domain_data import BASE_DIR, DOMAIN_PATH, NLU_PATH, RULES_PATH, load_nlu_examples, load_stateless_rules
+from faq_cache import data_fingerprint
+from language_detect import detect_script
+from response_index import get_response_index, load_or_build as load_response_index
+from sanitizer import cache_key, sanitize_input
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Minimum cosine similarity to the best intent centroid, and lead over the second best.
+# Calibrated limits are never below the threshold; an uncalibrated classifier uses both.
+FAQ_CLASSIFIER_THRESHOLD = float(os.environ.get("FAQ_CLASSIFIER_THRESHOLD", "0.5"))
+FAQ_CLASSIFIER_MARGIN = float(os.environ.get("FAQ_CLASSIFIER_MARGIN", "0.1"))
+# Share of in-process answers that must be right on held-out examples, per intent
+FAQ_CLASSIFIER_TARGET_PRECISION = float(os.environ.get("FAQ_CLASSIFIER_TARGET_PRECISION", "0.99"))
+# Runner-up margins tried for each intent during calibration
+CALIBRATION_MARGINS = (0.05, 0.1, 0.15, 0.2, 0.3)
+FAQ_INDEX_PATH = os.environ.get("FAQ_INDEX_PATH", os.path.join(BASE_DIR, "faq_index.npz"))
+NGRAM_RANGE = (2, 4)
+
+
+def char_ngrams(text: str) -> Counter:
+    """Word-bounded character n-grams of the canonical message, like Rasa's char_wb analyzer."""
+    grams: Counter = Counter()
+    low, high = NGRAM_RANGE
+    for word in cache_key(sanitize_input(text)).split():
+        padded = f" {word} "
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class FAQClassifier:
+    """Nearest-centroid intent scoring over TF-IDF character n-grams.
+
+    Each intent gets one centroid per script its examples are written in:
+    English, Hindi and Telugu examples share no n-grams, so a single averaged
+    centroid would cap every message's similarity well below 1.
+    """
+
+    def __init__(self, vocabulary: List[str], idf, centroids, row_intents: List[str], fingerprint: str = "",
+                 domain_path: str = DOMAIN_PATH, rules_path: str = RULES_PATH,
+                 threshold: float = FAQ_CLASSIFIER_THRESHOLD, margin: float = FAQ_CLASSIFIER_MARGIN,
+                 limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.vocabulary = {gram: i for i, gram in enumerate(vocabulary)}
+        self.idf = idf
+        self.unknown_weight = float(idf.max()) if len(idf) else 1.0
+        # (centroids x vocabulary), rows L2-normalized and grouped by intent
+        self.centroids = centroids
+        self.row_intents = row_intents
+        self.intents = sorted(set(row_intents))
+        self._intent_starts = np.array([row_intents.index(intent) for intent in self.intents], dtype=np.intp)
+        self.fingerprint = fingerprint
+        self.threshold = threshold
+        self.margin = margin
+        # intent -> (threshold, margin) from calibrate(); None uses the global pair for every intent
+        self.limits = limits
+        # intent -> utter_* response, for intents a stateless rule answers
+        self.responses: Dict[str, str] = load_stateless_rules(rules_path)
+        self.response_index = get_response_index() if domain_path == DOMAIN_PATH else load_response_index(domain_path)
+
+    @classmethod
+    def build(cls, examples: List[Tuple[str, str]], **kwargs) -> "FAQClassifier":
+        """Fit on (intent, text) pairs; every intent is kept so non-FAQ messages score as such."""
+        docs = [(intent, detect_script(text) or "", char_ngrams(text)) for intent, text in examples]
+        document_frequency: Counter = Counter()
+        for _, _, grams in docs:
+            document_frequency.update(grams.keys())
+        vocabulary = sorted(document_frequency)
+        index = {gram: i for i, gram in enumerate(vocabulary)}
+        # Smoothed idf, as in scikit-learn's TfidfVectorizer
+        idf = np.array([math.log((1 + len(docs)) / (1 + document_frequency[g])) + 1 for g in vocabulary])
+        rows = sorted({(intent, script) for intent, script, _ in docs})
+        row_of = {key: i for i, key in enumerate(rows)}
+        centroids = np.zeros((len(rows), len(vocabulary)))
+        for intent, script, grams in docs:
+            vector = np.zeros(len(vocabulary))
+            for gram, count in grams.items():
+                vector[index[gram]] = (1 + math.log(count)) * idf[index[gram]]
+            norm = np.linalg.norm(vector)
+            if norm:
+                centroids[row_of[(intent, script)]] += vector / norm
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.where(norms == 0, 1, norms)
+        return cls(vocabulary, idf, centroids, [intent for intent, _ in rows], **kwargs)
+
+    def scores(self, message: str):
+        """Best cosine similarity of the message to each intent's centroids, in self.intents order."""
+        columns, weights = [], []
+        unknown = 0.0
+        for gram, count in char_ngrams(message).items():
+            tf = 1 + math.log(count)
+            i = self.vocabulary.get(gram)
+            if i is None:
+                # Unseen n-grams still count towards the norm, so unfamiliar text scores low
+                unknown += (tf * self.unknown_weight) ** 2
+            else:
+                columns.append(i)
+                weights.append(tf * self.idf[i])
+        if not columns:
+            return np.zeros(len(self.intents))
+        weights = np.asarray(weights)
+        norm = math.sqrt(float(weights @ weights) + unknown)
+        similarities = self.centroids[:, columns] @ weights / norm
+        return np.maximum.reduceat(similarities, self._intent_starts)
+
+    def classify(self, message: str) -> Tuple[Optional[str], float, float]:
+        """(best intent, its score, lead over the runner-up intent)."""
+        scores = self.scores(message)
+        if len(scores) < 2:
+            return (self.intents[0] if len(scores) else None), float(scores.max(initial=0.0)), 1.0
+        second, best = np.argpartition(scores, -2)[-2:]
+        if scores[second] > scores[best]:
+            best, second = second, best
+        if scores[best] <= 0:
+            return None, 0.0, 0.0
+        return self.intents[best], float(scores[best]), float(scores[best] - scores[second])
+
+    def faq_intent(self, message: str) -> Optional[str]:
+        """The stateless FAQ intent the message is confidently recognized as, or None."""
+        intent, score, lead = self.classify(message)
+        if intent is None or intent not in self.responses:
+            return None
+        if self.limits is not None:
+            threshold, margin = self.limits.get(intent, (math.inf, math.inf))
+        else:
+            threshold, margin = self.threshold, self.margin
+        if score < threshold or lead < margin:
+            return None
+        return intent
+
+    def answer(self, message: str, lang: str) -> Optional[str]:
+        """The domain reply for a confidently recognized FAQ, or None to ask Rasa."""
+        intent = self.faq_intent(message)
+        if intent is None:
+            return None
+        return self.response_index.text(self.responses[intent], lang)
+
+    def save(self, path: str = FAQ_INDEX_PATH):
+        limits = self.limits or {}
+        np.savez_compressed(path, vocabulary=np.array(list(self.vocabulary)), idf=self.idf,
+                            centroids=self.centroids, row_intents=np.array(self.row_intents),
+                            fingerprint=np.array(self.fingerprint),
+                            limit_intents=np.array(list(limits), dtype=str),
+                            limit_values=np.array(list(limits.values()), dtype=float).reshape(-1, 2))
+
+    @classmethod
+    def load(cls, path: str = FAQ_INDEX_PATH, **kwargs) -> "FAQClassifier":
+        with np.load(path) as data:
+            limits = {intent: (float(t), float(m))
+                      for intent, (t, m) in zip(data["limit_intents"].tolist(), data["limit_values"])}
+            return cls(data["vocabulary"].tolist(), data["idf"], data["centroids"], data["row_intents"].tolist(),
+                       fingerprint=str(data["fingerprint"]), limits=limits, **kwargs)
+
+
+def held_out_predictions(examples: List[Tuple[str, str]]) -> List[Tuple[str, Optional[str], float, float]]:
+    """(true intent, predicted intent, score, lead) for each example, from a model built without it."""
+    results = []
+    for i, (intent, text) in enumerate(examples):
+        predicted, score, lead = FAQClassifier.build(examples[:i] + examples[i + 1:]).classify(text)
+        results.append((intent, predicted, score, lead))
+    return results
+
+
+def calibrate(predictions: List[Tuple[str, Optional[str], float, float]], intents: Iterable[str],
+              target: float = FAQ_CLASSIFIER_TARGET_PRECISION,
+              floor: float = FAQ_CLASSIFIER_THRESHOLD) -> Dict[str, Tuple[float, float]]:
+    """Per intent, the (threshold, margin) answering the most held-out messages at `target` precision.
+
+    Intents that reach the target at no threshold >= floor are left out, so
+    the classifier never answers them.
+    """
+    limits: Dict[str, Tuple[float, float]] = {}
+    for intent in intents:
+        best: Optional[Tuple[int, float, float]] = None
+        for margin in CALIBRATION_MARGINS:
+            claimed = sorted(((score, true == intent) for true, predicted, score, lead in predictions
+                              if predicted == intent and lead >= margin), reverse=True)
+            correct = 0
+            for answered, (score, right) in enumerate(claimed, 1):
+                if score < floor:
+                    break
+                correct += right
+                if correct / answered >= target and (best is None or answered > best[0]):
+                    best = (answered, score, margin)
+        if best is not None:
+            limits[intent] = (best[1], best[2])
+    return limits
+
+
+def build_calibrated(examples: List[Tuple[str, str]], **kwargs) -> FAQClassifier:
+    """Fit on all examples, with per-intent limits calibrated on leave-one-out predictions."""
+    classifier = FAQClassifier.build(examples, **kwargs)
+    classifier.limits = calibrate(held_out_predictions(examples), classifier.responses)
+    return classifier
+
+
+def current_fingerprint() -> str:
+    return data_fingerprint((DOMAIN_PATH, NLU_PATH, RULES_PATH))
+
+
+def load_or_build(index_path: str = FAQ_INDEX_PATH) -> FAQClassifier:
+    """The prebuilt index if it matches the current data files, else a fresh in-memory build."""
+    fingerprint = current_fingerprint()
+    if os.path.exists(index_path):
+        try:
+            classifier = FAQClassifier.load(index_path)
+            if classifier.fingerprint == fingerprint:
+                return classifier
+        except (OSError, ValueError, KeyError):
+            pass
+    return build_calibrated(load_nlu_examples(), fingerprint=fingerprint)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", action="store_true", help="write the index for the current data files")
+    parser.add_argument("--out", default=FAQ_INDEX_PATH)
+    args = parser.parse_args()
+    if args.build:
+        classifier = build_calibrated(load_nlu_examples(), fingerprint=current_fingerprint())
+        classifier.save(args.out)
+        print(f"Wrote {args.out}: {len(classifier.intents)} intents, {len(classifier.vocabulary)} n-grams")
+        print(f"Limits for {FAQ_CLASSIFIER_TARGET_PRECISION:.0%} held-out precision:")
+        for intent in sorted(classifier.responses):
+            limit = classifier.limits.get(intent)
+            print(f"  {intent:<24} " + (f"score >= {limit[0]:.2f}, lead >= {limit[1]:.2f}"
+                                         if limit else "left to Rasa"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Timing spans for the chat hot path, aggregated into per-stage histograms.
+
+Spans are on unless INSTRUMENTATION_ENABLED=0, in which case span() hands back
+a shared no-op and timed_action() leaves run() untouched. Set METRICS_PORT to
+serve the histograms as Prometheus text on http://127.0.0.1:<port>/metrics,
+and/or METRICS_LOG to append every span, with its session id, as a JSON line.
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import functools
+import threading
+from typing import Dict, List, Optional, Tuple
+
+INSTRUMENTATION_ENABLED = os.environ.get("INSTRUMENTATION_ENABLED", "1").lower() not in ("0", "false", "no")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_LOG = os.environ.get("METRICS_LOG", "")
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; chosen to separate sub-ms work from network round trips
+BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    __slots__ = ("counts", "count", "total", "errors")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, ok: bool = True):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if not ok:
+            self.errors += 1
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("metrics", "stage", "session_id", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str, session_id: Optional[str]):
+        self.metrics = metrics
+        self.stage = stage
+        self.session_id = session_id
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.session_id, ok=exc_type is None)
+        return False
+
+
+class Metrics:
+    """Per-stage histograms for this process, optionally mirrored to a span log."""
+
+    def __init__(self, enabled: bool = INSTRUMENTATION_ENABLED, log_path: str = METRICS_LOG):
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._log = open(log_path, "a", encoding="utf-8", buffering=1) if enabled and log_path else None
+
+    def span(self, stage: str, session_id: Optional[str] = None):
+        """Context manager timing one stage of a turn."""
+        if not self.enabled:
+            return _NOOP
+        return Span(self, stage, session_id)
+
+    def observe(self, stage: str, seconds: float, session_id: Optional[str] = None, ok: bool = True):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds, ok)
+            if self._log is not None:
+                self._log.write(json.dumps({
+                    "ts": round(time.time(), 3), "session": session_id, "stage": stage,
+                    "ms": round(seconds * 1000, 3), "ok": ok,
+                }) + "\n")
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Count, error count and mean per stage, for logs and benchmarks."""
+        with self._lock:
+            return {
+                stage: {"count": h.count, "errors": h.errors,
+                        "mean_ms": round(h.total / h.count * 1000, 3) if h.count else 0.0}
+                for stage, h in self._histograms.items()
+            }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = [
+            "# HELP chatbot_stage_seconds Time spent in each stage of a chat turn.",
+            "# TYPE chatbot_stage_seconds histogram",
+        ]
+        errors: List[str] = []
+        with self._lock:
+            for stage in sorted(self._histograms):
+                h = self._histograms[stage]
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'chatbot_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'chatbot_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'chatbot_stage_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+                lines.append(f'chatbot_stage_seconds_count{{stage="{stage}"}} {h.count}')
+                errors.append(f'chatbot_stage_errors_total{{stage="{stage}"}} {h.errors}')
+        lines += ["# HELP chatbot_stage_errors_total Spans that ended in an exception.",
+                  "# TYPE chatbot_stage_errors_total counter"] + errors
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(metrics: "Metrics", port: int):
+    """Expose `metrics` on localhost from a daemon thread; returns the HTTP server."""
+    # Imported here: http.server is a noticeable share of the app's import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = self.server.metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics, starting the endpoint on first use."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                metrics = Metrics()
+                if metrics.enabled and METRICS_PORT:
+                    try:
+                        serve_metrics(metrics, METRICS_PORT)
+                    except OSError as e:
+                        # Another process (e.g. a second Streamlit worker) owns the port
+                        logger.warning("Metrics endpoint not started on port %d: %s", METRICS_PORT, e)
+                _metrics = metrics
+    return _metrics
+
+
+def span(stage: str, session_id: Optional[str] = None):
+    """Time a stage of a turn on the process-wide metrics."""
+    # Checked before get_metrics() so a disabled span costs one global lookup
+    if not INSTRUMENTATION_ENABLED:
+        return _NOOP
+    return get_metrics().span(stage, session_id)
+
+
+def timed_action(run):
+    """Decorator for rasa_sdk Action.run that records an `action.<name>` span."""
+    if not INSTRUMENTATION_ENABLED:
+        return run
+
+    @functools.wraps(run)
+    def wrapper(self, dispatcher, tracker, domain):
+        with span(f"action.{self.name()}", tracker.sender_id):
+            return run(self, dispatcher, tracker, domain)
+
+    return wrapper
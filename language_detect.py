@@ -0,0 +1,108 @@
+from typing import Optional
+
+# A message needs at least this many letters of one script to be classified
+MIN_LETTERS = 3
+# ...and that script must make up this share of its letters
+MIN_SHARE = 0.6
+# Only the start of a message is inspected; long messages do not change script midway
+SCAN_CHARS = 160
+
+# Words and word endings that occur in Marathi but not Hindi, and vice versa, plus
+# each language's own name. Devanagari alone cannot separate the two.
+MARATHI_WORDS = frozenset(
+    "आहे आहेस आहेत नाही मला माझे माझा माझी तुम्ही तुमचे तुमची तुमच्या तू काय कसे कसा कशी "
+    "हवी हवे हवा करा करू झाले झाला आणि मध्ये साठी पुन्हा भेटू सुरू नमस्कार मराठी".split()
+)
+MARATHI_SUFFIXES = ("चा", "ची", "चे", "च्या", "तंय", "ावे", "ायचे")
+HINDI_WORDS = frozenset(
+    "है हैं हूँ हूं में का की के क्या मुझे मैं नहीं और चाहिए कैसे कहाँ कहां मेरा मेरी मेरे आप "
+    "करें कितना चाहता चाहती फिर मिलेंगे हाँ खोलें बनवाएं शुरू अलविदा हिंदी हिन्दी".split()
+)
+
+# Latin text switches an Indic-language conversation to English only when it reads
+# as English: this many English function words and no romanized Hindi/Marathi ones.
+# Otherwise "mujhe balance batao" or a lone "balance" would flip the language.
+ENGLISH_MIN_MARKERS = 2
+ENGLISH_WORDS = frozenset(
+    "i i'm me my is are am the a an to for of with and not how what where when which can could "
+    "do does you your want need please this that".split()
+)
+ROMANIZED_INDIC_WORDS = frozenset(
+    "mujhe mujhko mera meri mere hai hain kya kaise kaisa kahan batao bataiye chahiye karna karo "
+    "nahi nahin aap aapka mala maza majha mazhe aahe ahe kasa kase kashi pahije kay tumhi tumcha".split()
+)
+
+
+def detect_script(text: str) -> Optional[str]:
+    """Dominant script of a message: "latin", "devanagari", "telugu", "kannada" or None.
+
+    Upper-case Latin is not counted, so acronyms like "ATM" or "IFSC" typed in
+    an Indic-language conversation do not read as English.
+    """
+    latin = devanagari = telugu = kannada = 0
+    for ch in text[:SCAN_CHARS]:
+        if "a" <= ch <= "z":
+            latin += 1
+        elif "\u0900" <= ch <= "\u097f":
+            devanagari += 1
+        elif "\u0c00" <= ch <= "\u0c7f":
+            telugu += 1
+        elif "\u0c80" <= ch <= "\u0cff":
+            kannada += 1
+    total = latin + devanagari + telugu + kannada
+    if total < MIN_LETTERS:
+        return None
+    count, script = max((latin, "latin"), (devanagari, "devanagari"), (telugu, "telugu"), (kannada, "kannada"))
+    if count < MIN_LETTERS or count < total * MIN_SHARE:
+        return None
+    return script
+
+
+def marathi_score(text: str) -> int:
+    """Positive for Marathi-looking Devanagari text, negative for Hindi, 0 when unsure."""
+    score = 0
+    # ळ and the candra-e in loanwords (बँक) are common in Marathi and rare in Hindi
+    if "ळ" in text or "ॅ" in text:
+        score += 1
+    for word in text.split():
+        word = word.strip("?!.,।")
+        if word in MARATHI_WORDS or word.endswith(MARATHI_SUFFIXES):
+            score += 1
+        elif word in HINDI_WORDS:
+            score -= 1
+    return score
+
+
+def reads_as_english(text: str) -> bool:
+    """Whether Latin text is English rather than romanized Hindi/Marathi or a bare keyword."""
+    words = [word.strip("?!.,") for word in text.lower().split()]
+    if any(word in ROMANIZED_INDIC_WORDS for word in words):
+        return False
+    return sum(word in ENGLISH_WORDS for word in words) >= ENGLISH_MIN_MARKERS
+
+
+def detect_language(text: str, current: Optional[str] = None) -> Optional[str]:
+    """Language code for a message from its script, or None when there is no clear signal.
+
+    Devanagari is resolved to Hindi or Marathi by marker words; a tie keeps
+    `current` if that is already one of the two. Latin text is English unless
+    `current` is another language, which it overrides only when the text
+    reads_as_english(); romanized Hindi or Marathi keeps the user's choice.
+    """
+    script = detect_script(text)
+    if script is None:
+        return None
+    if script == "latin":
+        if current in (None, "en") or reads_as_english(text):
+            return "en"
+        return None
+    if script == "telugu":
+        return "te"
+    if script == "kannada":
+        return "kn"
+    score = marathi_score(text)
+    if score > 0:
+        return "mr"
+    if score < 0:
+        return "hi"
+    return current if current in ("hi", "mr") else "hi"
@@ -1,8 +1,4 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from datetime import datetime, timedelta
-import random
 
 #0E1117
     #FAFAFA
@@ -42,56 +38,51 @@ h1, h2, h3, h4, h5, h6 {
 st.title("📊 Regional-Language Chatbot Analytics")
 st.markdown("An elegant view of chatbot performance and user engagement.")
 
+# pandas comes in with the rollups, after the title is on screen
+from dashboard_rollups import ROLLUP_TTL_SECONDS, build_views, load_rollups
+
 # ---------------------
-# 📦 Generate Dummy Data
+# 📦 Load Chatbot Events
 # ---------------------
-languages = ["Marathi", "Tamil", "Telugu", "Punjabi", "Hindi", "English"]
-topics = ["Account Opening", "Fraud Alerts", "UPI Help", "Loan Info", "KYC Process"]
+@st.cache_data(ttl=ROLLUP_TTL_SECONDS)
+def get_dashboard_views():
+    """KPIs and chart data from the pre-rolled hourly rollups, memoized across reruns."""
+    return build_views(load_rollups())
 
-data = []
-start_date = datetime.now() - timedelta(days=30)
-for i in range(200):
-    data.append({
-        "date": start_date + timedelta(days=random.randint(0, 30)),
-        "language": random.choice(languages),
-        "topic": random.choice(topics)
-    })
+views = get_dashboard_views()
 
-df = pd.DataFrame(data)
+if not views["total"]:
+    st.info("No chatbot events logged yet. Chat with the bot, or run "
+            "`python analytics.py --generate 100000` to load synthetic data.")
+    st.stop()
 
 # ---------------------
 # 📌 KPIs
 # ---------------------
-total_users = len(df)
-unique_languages = df["language"].nunique()
-most_used_lang = df["language"].mode()[0]
-
-col1, col2, col3 = st.columns(3)
-col1.metric("👥 Total Interactions", f"{total_users}")
-col2.metric("🌐 Languages Used", f"{unique_languages}")
-col3.metric("🏆 Top Language", most_used_lang)
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("👥 Total Interactions", f"{views['total']}")
+col2.metric("🌐 Languages Used", f"{views['unique_languages']}")
+col3.metric("🏆 Top Language", views["top_language"])
+col4.metric("⏱️ Avg Response Time", f"{views['mean_latency_ms']:.0f} ms")
 
 # ---------------------
 # 📊 Charts
 # ---------------------
+# plotly is only imported once there is data to chart, after the KPIs are on screen
+import plotly.express as px
 
 # Language Distribution
-lang_counts = df["language"].value_counts().reset_index()
-lang_counts.columns = ["Language", "Count"]
-fig_lang = px.pie(lang_counts, values="Count", names="Language",
+fig_lang = px.pie(views["lang_counts"], values="Count", names="Language",
                   title="Language Distribution", color_discrete_sequence=px.colors.qualitative.Set3)
 st.plotly_chart(fig_lang, use_container_width=True)
 
 # Usage Over Time
-df_daily = df.groupby(df["date"].dt.date).size().reset_index(name="Count")
-fig_time = px.line(df_daily, x="date", y="Count",
+fig_time = px.line(views["daily"], x="date", y="Count",
                    title="Usage Over Time", markers=True)
 st.plotly_chart(fig_time, use_container_width=True)
 
 # Topics Breakdown
-topic_counts = df["topic"].value_counts().reset_index()
-topic_counts.columns = ["Topic", "Count"]
-fig_topic = px.bar(topic_counts, x="Topic", y="Count",
+fig_topic = px.bar(views["topic_counts"], x="Topic", y="Count",
                    title="Top Topics Asked", text="Count", color="Topic")
 fig_topic.update_traces(textposition="outside")
 st.plotly_chart(fig_topic, use_container_width=True)
@@ -100,4 +91,4 @@ st.plotly_chart(fig_topic, use_container_width=True)
 # 📌 Footer
 # ---------------------
 st.markdown("---")
-st.markdown("💡 *This dashboard shows demo analytics. Connect it to your chatbot logs for real insights.*")
+st.markdown("💡 *Built from the chatbot's per-turn event log (`analytics.db`), pre-rolled by hour.*")
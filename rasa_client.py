@@ -0,0 +1,210 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Client configuration (overridable through environment variables)
+RASA_URL = os.environ.get("RASA_URL", "http://0.0.0.0:5005/webhooks/rest/webhook")
+RASA_POOL_SIZE = int(os.environ.get("RASA_POOL_SIZE", "20"))
+RASA_CONNECT_TIMEOUT = float(os.environ.get("RASA_CONNECT_TIMEOUT", "2"))
+RASA_READ_TIMEOUT = float(os.environ.get("RASA_READ_TIMEOUT", "10"))
+RASA_MAX_RETRIES = int(os.environ.get("RASA_MAX_RETRIES", "2"))
+RASA_BACKOFF_BASE = float(os.environ.get("RASA_BACKOFF_BASE", "0.1"))
+RASA_BACKOFF_CAP = float(os.environ.get("RASA_BACKOFF_CAP", "1.0"))
+
+# Status codes worth retrying; any other non-200 response fails immediately
+RETRY_STATUS_CODES = {502, 503, 504}
+
+
+def backoff_delay(attempt: int, base: float = RASA_BACKOFF_BASE, cap: float = RASA_BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff delay for the given retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RasaClientError(Exception):
+    """Raised when Rasa is unreachable or answers with an error."""
+
+
+class LatencyStats:
+    """Thread-safe running latency metrics for webhook calls."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples: List[float] = []
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+
+    def record(self, seconds: float, ok: bool = True):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            self._samples.append(seconds)
+            if len(self._samples) > self._window:
+                del self._samples[: len(self._samples) - self._window]
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return call counters and p50/p95/max latency in milliseconds."""
+        with self._lock:
+            samples = sorted(self._samples)
+            calls, errors, retries = self.calls, self.errors, self.retries
+        if not samples:
+            return {"calls": calls, "errors": errors, "retries": retries,
+                    "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "calls": calls,
+            "errors": errors,
+            "retries": retries,
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+
+
+class Attempts:
+    """Retry policy for one webhook call, shared by RasaClient and async_backend.
+
+    Iterate (or `async for`) to run up to max_retries + 1 attempts with jittered
+    backoff between them, and report each attempt with failed() or succeeded().
+    Only errors in `retryable` (nothing reached Rasa) and RETRY_STATUS_CODES are
+    retried; any other error, such as a read timeout after the message was sent,
+    raises RasaClientError at once, since a retry could run the turn twice.
+    """
+
+    def __init__(self, stats: LatencyStats, retryable: Tuple[Type[BaseException], ...],
+                 max_retries: int = RASA_MAX_RETRIES, backoff_base: float = RASA_BACKOFF_BASE,
+                 backoff_cap: float = RASA_BACKOFF_CAP):
+        self.stats = stats
+        self.retryable = retryable
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.last_error: Optional[BaseException] = None
+        self._start = 0.0
+
+    def _delay(self, attempt: int) -> float:
+        self.stats.record_retry()
+        return backoff_delay(attempt - 1, self.backoff_base, self.backoff_cap)
+
+    def __iter__(self):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self._delay(attempt))
+            self._start = time.perf_counter()
+            yield attempt
+
+    async def __aiter__(self):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._delay(attempt))
+            self._start = time.perf_counter()
+            yield attempt
+
+    def failed(self, error: BaseException):
+        """Record a request that raised; re-raises unless a retry is safe."""
+        self.stats.record(time.perf_counter() - self._start, ok=False)
+        if not isinstance(error, self.retryable):
+            raise RasaClientError(f"Rasa did not answer: {error!r}") from error
+        self.last_error = error
+
+    def succeeded(self, status_code: int) -> bool:
+        """Record a response; False means retry, a non-retryable error status raises."""
+        elapsed = time.perf_counter() - self._start
+        if status_code in RETRY_STATUS_CODES:
+            self.stats.record(elapsed, ok=False)
+            self.last_error = RasaClientError(f"Rasa returned HTTP {status_code}")
+            return False
+        if status_code != 200:
+            self.stats.record(elapsed, ok=False)
+            raise RasaClientError(f"Rasa returned HTTP {status_code}")
+        self.stats.record(elapsed)
+        return True
+
+    @staticmethod
+    def parse(decode: Callable[[], object]) -> List[Dict]:
+        """The decoded body, which the REST channel always sends as a list of message dicts."""
+        try:
+            data = decode()
+        except ValueError as e:
+            raise RasaClientError(f"Invalid response from Rasa: {e}")
+        if not isinstance(data, list) or not all(isinstance(m, dict) for m in data):
+            raise RasaClientError(f"Unexpected response from Rasa: {str(data)[:200]}")
+        return data
+
+    def exhausted(self) -> RasaClientError:
+        return RasaClientError(f"Rasa unreachable after {self.max_retries + 1} attempts: {self.last_error}")
+
+
+class RasaClient:
+    """Keep-alive client for the Rasa REST webhook backed by a pooled Session."""
+
+    def __init__(
+        self,
+        url: str = RASA_URL,
+        pool_size: int = RASA_POOL_SIZE,
+        connect_timeout: float = RASA_CONNECT_TIMEOUT,
+        read_timeout: float = RASA_READ_TIMEOUT,
+        max_retries: int = RASA_MAX_RETRIES,
+        backoff_base: float = RASA_BACKOFF_BASE,
+        backoff_cap: float = RASA_BACKOFF_CAP,
+    ):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stats = LatencyStats()
+
+        self.session = requests.Session()
+        # Retries are handled in send() so they can be jittered and counted
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, sender: str, message: str, metadata: Optional[Dict] = None) -> List[Dict]:
+        """Post a message to the webhook and return the raw list of bot messages."""
+        payload = {"sender": sender, "message": message}
+        if metadata:
+            payload["metadata"] = metadata
+
+        # ConnectionError includes ConnectTimeout but not ReadTimeout, which comes after
+        # the message was sent and so is never retried
+        attempts = Attempts(self.stats, (requests.ConnectionError,), self.max_retries,
+                            self.backoff_base, self.backoff_cap)
+        for _ in attempts:
+            try:
+                resp = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                attempts.failed(e)
+                continue
+            if attempts.succeeded(resp.status_code):
+                return attempts.parse(resp.json)
+        raise attempts.exhausted()
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[RasaClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> RasaClient:
+    """Return the process-wide client shared by every Streamlit session."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RasaClient()
+    return _client
@@ -0,0 +1,365 @@
+"""Offline multilingual regression pass: replay conversations generated from rules.yml.
+
+Every rule becomes test conversations in each language the nlu.yml examples
+cover: the rule's intents are voiced by that language's examples, sent with
+the same language metadata the chatbot UI sends, and each reply is compared
+with the domain.yml text the rule's utter_* actions render in that language
+(custom actions are only required to answer). Every turn must also finish
+within the latency budget. Conversations run in parallel on a process pool
+against one of:
+
+  stub       in-process: faq_classifier for NLU, rules.yml for the next
+             action, the compiled response index for the reply (default).
+             A smoke test only: the classifier is fitted on the very
+             utterances being replayed, so NLU cannot fail; it checks the
+             rules, the per-language domain texts and the harness itself
+  --model    a trained model, loaded with rasa's Agent in every worker
+  --url      a running Rasa REST webhook
+
+Usage:
+    python replay.py
+    python replay.py --model models/full.tar.gz --workers 4
+    python replay.py --url http://localhost:5005/webhooks/rest/webhook --budget-ms 500
+    python replay.py --languages hi mr --sessions 10 --out results/replay.json
+
+Exits non-zero if any turn fails. Gate CI on a --model or --url run; the
+stub run belongs next to it as a fast smoke test. Rules and languages the
+nlu.yml examples cannot voice are listed up front and are not tested at all;
+at present that is all of Kannada and most of the FAQ rules.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from analytics import LANGUAGE_NAMES
+from domain_data import (
+    DEFAULT_LANGUAGE, NLU_PATH, RULES_PATH, load_action_endpoint, load_nlu_examples, load_rules,
+)
+from language_detect import detect_language
+from response_index import ResponseIndex, get_response_index
+
+# Longest a single turn may take, from sending the message to the last reply
+REPLAY_BUDGET_MS = float(os.environ.get("REPLAY_BUDGET_MS", "1000"))
+REPLAY_WORKERS = int(os.environ.get("REPLAY_WORKERS", str(min(4, os.cpu_count() or 1))))
+# How the stub answers the custom actions, like benchmarks/stub_rasa.StubActionHandler
+STUB_CUSTOM_ACTIONS = {
+    "action_ask_language_preference": ("utter_greet",),
+    "action_set_language": ("utter_language_set", "utter_greet"),
+}
+
+
+class Turn(NamedTuple):
+    intent: str
+    message: str
+    actions: Tuple[str, ...]
+    # Reply texts in order, or None when a custom action decides them
+    expected: Optional[Tuple[str, ...]]
+
+
+class Conversation(NamedTuple):
+    conversation_id: str
+    rule: str
+    lang: str
+    turns: Tuple[Turn, ...]
+
+
+def example_language(text: str) -> Optional[str]:
+    """Language of an NLU example; short Latin-only examples ("hi", "ok") count as English."""
+    lang = detect_language(text)
+    if lang is None and text.isascii():
+        return DEFAULT_LANGUAGE
+    return lang
+
+
+def examples_by_language(nlu_path: str = NLU_PATH) -> Dict[str, Dict[str, List[str]]]:
+    """intent -> language -> example texts."""
+    examples: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+    for intent, text in load_nlu_examples(nlu_path):
+        lang = example_language(text)
+        if lang is not None:
+            examples[intent][lang].append(text)
+    return examples
+
+
+def rule_turns(rule: Dict) -> Optional[List[Tuple[str, Tuple[str, ...]]]]:
+    """(intent, actions that follow it) per user turn, or None if the rule needs prior state."""
+    if rule.get("condition") or rule.get("conversation_start"):
+        return None
+    turns: List[Tuple[str, List[str]]] = []
+    for step in rule.get("steps") or []:
+        if step.get("intent"):
+            turns.append((step["intent"], []))
+        elif step.get("action") and turns:
+            turns[-1][1].append(step["action"])
+    return [(intent, tuple(actions)) for intent, actions in turns] or None
+
+
+def expected_replies(actions: Tuple[str, ...], lang: str, index: ResponseIndex) -> Optional[Tuple[str, ...]]:
+    if not all(action.startswith("utter_") for action in actions):
+        return None
+    return tuple(index.text(action, lang) or "" for action in actions)
+
+
+def generate_conversations(languages: List[str], sessions: int = 0, session_turns: int = 6, seed: int = 0,
+                           rules_path: str = RULES_PATH, nlu_path: str = NLU_PATH,
+                           index: Optional[ResponseIndex] = None
+                           ) -> Tuple[List[Conversation], Dict[str, List[str]]]:
+    """Conversations for every rule and language, plus what could not be covered.
+
+    Gaps map "rule: reason" to the languages it applies to.
+
+    A rule yields one conversation per paraphrase of its intent in a language.
+    With `sessions`, each language also gets that many longer conversations
+    that chain random single-turn rules under one sender, so slot state
+    carries across turns.
+    """
+    index = index or get_response_index()
+    examples = examples_by_language(nlu_path)
+    conversations: List[Conversation] = []
+    gaps: Dict[str, List[str]] = defaultdict(list)
+    single_turn: Dict[str, List[Tuple[str, str, Tuple[str, ...]]]] = defaultdict(list)
+    for rule in load_rules(rules_path):
+        name = rule.get("rule", "")
+        turns = rule_turns(rule)
+        if turns is None:
+            gaps[f"{name}: needs prior conversation state"] += languages
+            continue
+        for lang in languages:
+            texts = [examples[intent].get(lang, []) for intent, _ in turns]
+            missing = [intent for (intent, _), found in zip(turns, texts) if not found]
+            if missing:
+                gaps[f"{name}: no nlu.yml examples for {', '.join(missing)}"].append(lang)
+                continue
+            for k in range(max(len(found) for found in texts)):
+                conversations.append(Conversation(
+                    f"{len(conversations):05d}", name, lang,
+                    tuple(Turn(intent, found[k % len(found)], actions, expected_replies(actions, lang, index))
+                          for (intent, actions), found in zip(turns, texts)),
+                ))
+            if len(turns) == 1:
+                single_turn[lang].append((name, turns[0][0], turns[0][1]))
+
+    rng = random.Random(seed)
+    for lang in languages:
+        for _ in range(sessions if single_turn[lang] else 0):
+            picked = [rng.choice(single_turn[lang]) for _ in range(session_turns)]
+            conversations.append(Conversation(
+                f"{len(conversations):05d}", "session", lang,
+                tuple(Turn(intent, rng.choice(examples[intent][lang]), actions,
+                           expected_replies(actions, lang, index))
+                      for _, intent, actions in picked),
+            ))
+    return conversations, dict(gaps)
+
+
+class StubBot:
+    """In-process stand-in for Rasa: the FAQ classifier picks the intent, the rules the action."""
+
+    def __init__(self, rules_path: str = RULES_PATH):
+        from faq_classifier import load_or_build
+        self.classifier = load_or_build()
+        self.index = get_response_index()
+        self.actions: Dict[str, Tuple[str, ...]] = {}
+        for rule in load_rules(rules_path):
+            for intent, actions in rule_turns(rule) or []:
+                self.actions.setdefault(intent, actions)
+
+    def respond(self, sender: str, message: str, lang: str) -> List[str]:
+        intent, _, _ = self.classifier.classify(message)
+        responses: List[str] = []
+        for action in self.actions.get(intent, ("utter_default",)):
+            responses += STUB_CUSTOM_ACTIONS.get(action, (action,))
+        return [text for text in (self.index.text(response, lang) for response in responses) if text]
+
+
+class AgentBot:
+    """A trained model loaded in this process, with the action server from endpoints.yml."""
+
+    def __init__(self, model_path: str):
+        from rasa.core.agent import Agent
+        from rasa.utils.endpoints import EndpointConfig
+        action_url = load_action_endpoint()
+        self.agent = Agent.load(model_path, action_endpoint=EndpointConfig(action_url) if action_url else None)
+        self.loop = asyncio.new_event_loop()
+
+    def respond(self, sender: str, message: str, lang: str) -> List[str]:
+        from rasa.core.channels.channel import CollectingOutputChannel, UserMessage
+        metadata = {"language": lang, "language_name": LANGUAGE_NAMES.get(lang, lang)}
+        messages = self.loop.run_until_complete(self.agent.handle_message(
+            UserMessage(message, CollectingOutputChannel(), sender, metadata=metadata)
+        ))
+        return [m["text"] for m in messages or [] if m.get("text")]
+
+
+class WebhookBot:
+    """A running Rasa server, reached through its REST channel."""
+
+    def __init__(self, url: str):
+        from rasa_client import RasaClient
+        self.client = RasaClient(url=url)
+
+    def respond(self, sender: str, message: str, lang: str) -> List[str]:
+        metadata = {"language": lang, "language_name": LANGUAGE_NAMES.get(lang, lang)}
+        return [m["text"] for m in self.client.send(sender, message, metadata) if m.get("text")]
+
+
+def open_bot(target: str, location: Optional[str]):
+    if target == "model":
+        return AgentBot(location)
+    if target == "url":
+        return WebhookBot(location)
+    return StubBot()
+
+
+# Per worker process: the bot, the run id (keeps senders unique across runs) and the budget
+_bot = None
+_run_id = ""
+_budget_ms = REPLAY_BUDGET_MS
+
+
+def _init_worker(target: str, location: Optional[str], run_id: str, budget_ms: float):
+    global _bot, _run_id, _budget_ms
+    _bot = open_bot(target, location)
+    _run_id = run_id
+    _budget_ms = budget_ms
+
+
+def run_conversation(conversation: Conversation) -> List[Dict]:
+    """Replay one conversation on this worker's bot; one result per turn."""
+    sender = f"replay-{_run_id}-{conversation.conversation_id}"
+    results = []
+    for turn in conversation.turns:
+        start = time.perf_counter()
+        try:
+            replies, error = _bot.respond(sender, turn.message, conversation.lang), None
+        except Exception as e:
+            replies, error = [], f"{type(e).__name__}: {e}"
+        ms = (time.perf_counter() - start) * 1000
+        if error is not None:
+            reason = error
+        elif turn.expected is not None and tuple(r.strip() for r in replies) != \
+                tuple(e.strip() for e in turn.expected):
+            reason = "unexpected reply"
+        elif turn.expected is None and not replies:
+            reason = "no reply"
+        elif ms > _budget_ms:
+            reason = f"over budget ({ms:.1f} ms > {_budget_ms:g} ms)"
+        else:
+            reason = None
+        results.append({
+            "conversation": conversation.conversation_id, "rule": conversation.rule,
+            "lang": conversation.lang, "intent": turn.intent, "message": turn.message,
+            "expected": list(turn.expected) if turn.expected is not None else None,
+            "replies": replies, "ms": round(ms, 2), "ok": reason is None, "reason": reason,
+        })
+    return results
+
+
+def replay(conversations: List[Conversation], target: str = "stub", location: Optional[str] = None,
+           workers: int = REPLAY_WORKERS, budget_ms: float = REPLAY_BUDGET_MS) -> List[Dict]:
+    """Run the conversations across a pool of worker processes; returns every turn's result."""
+    initargs = (target, location, uuid.uuid4().hex[:8], budget_ms)
+    chunksize = max(1, len(conversations) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        return [turn for turns in pool.map(run_conversation, conversations, chunksize=chunksize)
+                for turn in turns]
+
+
+def summarize(results: List[Dict]) -> Dict[str, Dict]:
+    """Turns, failures and latency percentiles per language."""
+    by_lang: Dict[str, List[Dict]] = defaultdict(list)
+    for result in results:
+        by_lang[result["lang"]].append(result)
+    summary = {}
+    for lang, turns in sorted(by_lang.items()):
+        latencies = sorted(t["ms"] for t in turns)
+        summary[lang] = {
+            "turns": len(turns),
+            "failed": sum(not t["ok"] for t in turns),
+            "p50_ms": latencies[len(latencies) // 2],
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "max_ms": latencies[-1],
+        }
+    return summary
+
+
+def coverage_report(gaps: Dict[str, List[str]], languages: List[str],
+                    conversations: List[Conversation]) -> List[str]:
+    """The gaps, grouped: languages nothing can be replayed in, rules no language can voice, the rest."""
+    lines = []
+    covered = {conversation.lang for conversation in conversations}
+    uncovered_langs = [lang for lang in languages if lang not in covered]
+    for lang in uncovered_langs:
+        lines.append(f"[{lang}] no nlu.yml examples in {LANGUAGE_NAMES.get(lang, lang)}: none of its rules are tested")
+    everywhere = [gap.split(":")[0] for gap, langs in gaps.items()
+                  if "no nlu.yml examples" in gap and set(languages) <= set(langs)]
+    if everywhere:
+        lines.append(f"[all] {len(everywhere)} rules have no nlu.yml examples in any language: {', '.join(everywhere)}")
+    for gap, langs in gaps.items():
+        rest = [lang for lang in langs if lang not in uncovered_langs]
+        if rest and gap.split(":")[0] not in everywhere:
+            lines.append(f"[{', '.join(rest)}] {gap}")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--model", help="trained model to load in every worker")
+    backend.add_argument("--url", help="REST webhook of a running Rasa server")
+    parser.add_argument("--languages", nargs="+", default=list(LANGUAGE_NAMES))
+    parser.add_argument("--sessions", type=int, default=5, help="chained multi-rule conversations per language")
+    parser.add_argument("--session-turns", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=REPLAY_WORKERS)
+    parser.add_argument("--budget-ms", type=float, default=REPLAY_BUDGET_MS, help="latency budget per turn")
+    parser.add_argument("--show", type=int, default=20, help="failed turns to print")
+    parser.add_argument("--out", help="write every turn's result to this JSON file")
+    args = parser.parse_args()
+
+    target, location = ("model", args.model) if args.model else ("url", args.url) if args.url else ("stub", None)
+    conversations, gaps = generate_conversations(args.languages, args.sessions, args.session_turns, args.seed)
+    print(f"{len(conversations)} conversations, {sum(len(c.turns) for c in conversations)} turns, "
+          f"target {target}{' ' + location if location else ''}, {args.workers} workers")
+    if target == "stub":
+        print("  stub mode is a smoke test: its classifier is fitted on these utterances, so NLU is not "
+              "tested; gate CI with --model or --url")
+    for line in coverage_report(gaps, args.languages, conversations):
+        print(f"  not covered {line}")
+
+    start = time.perf_counter()
+    results = replay(conversations, target, location, args.workers, args.budget_ms)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    print(f"replayed in {elapsed:.1f} s")
+    print(f"  {'lang':<5} {'turns':>6} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for lang, s in summary.items():
+        print(f"  {lang:<5} {s['turns']:>6} {s['failed']:>7} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} "
+              f"{s['max_ms']:>8.1f}")
+    failed = [r for r in results if not r["ok"]]
+    for r in failed[:args.show]:
+        print(f"  FAIL [{r['lang']}] {r['rule']} / {r['intent']}: {r['message']!r}: {r['reason']}")
+        if r["reason"] == "unexpected reply":
+            print(f"       expected {r['expected']}\n       got      {r['replies']}")
+    if len(failed) > args.show:
+        print(f"  ... and {len(failed) - args.show} more")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"target": target, "location": location, "smoke_test": target == "stub",
+                       "seconds": round(elapsed, 2),
+                       "summary": summary, "gaps": gaps, "turns": results}, f, ensure_ascii=False, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Compiled, memory-mapped index of the domain.yml responses.
+
+Each (response name, language code) pair maps to the text Rasa would render
+for that language: the variant conditioned on `slot language == code`, or the
+unconditioned fallback when the domain has none. Entries sit in an
+open-addressing hash table, so a lookup is one or two probes into the mapped
+file and no YAML is parsed at startup.
+
+Build the index and list missing language variants with:
+    python response_index.py --build [--strict]
+
+Layout, little-endian:
+    header   magic, version, table size, entry count, sha256 of domain.yml,
+             offset and length of the "\\0"-joined language codes
+    table    fixed-size slots: crc32 of the key, key offset and length, flags,
+             text offset and length, sha256 audio key of the text (tts_bundle)
+    strings  UTF-8 keys ("name\\0lang") and texts; equal texts are stored once
+"""
+import os
+import sys
+import mmap
+import zlib
+import struct
+import hashlib
+import argparse
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from domain_data import BASE_DIR, DEFAULT_LANGUAGE, DOMAIN_PATH, iter_response_variants
+from bundle_utils import audio_key, staged_file
+
+RESPONSE_INDEX_PATH = os.environ.get("RESPONSE_INDEX_PATH", os.path.join(BASE_DIR, "response_index.bin"))
+INDEX_MAGIC = b"RSPX"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sHxxII32sII")
+SLOT = struct.Struct("<IIHHII32s")
+# Slot flag: no variant for this language, the text is the unconditioned fallback
+FALLBACK = 1
+# Key suffix for the unconditioned variant, used for languages the domain never names
+ANY_LANGUAGE = ""
+
+
+class Response(NamedTuple):
+    text: str
+    audio_key: str
+    fallback: bool
+
+
+def _key(name: str, lang: str) -> bytes:
+    return f"{name}\0{lang}".encode("utf-8")
+
+
+def domain_fingerprint(domain_path: str = DOMAIN_PATH) -> bytes:
+    with open(domain_path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def compile_domain(domain_path: str = DOMAIN_PATH) -> Tuple[bytes, Dict[str, List[Tuple[str, str]]]]:
+    """Serialize the domain's responses; returns (index bytes, gaps).
+
+    gaps["fallback"] lists (response, language) pairs answered by the
+    unconditioned variant, gaps["missing"] those with no text at all, and
+    gaps["duplicate"] pairs with several variants, of which only the first
+    is indexed (Rasa would pick one at random).
+    """
+    explicit: Dict[str, Dict[str, str]] = {}
+    unconditioned: Dict[str, str] = {}
+    gaps: Dict[str, List[Tuple[str, str]]] = {"fallback": [], "missing": [], "duplicate": []}
+    for name, lang, text in iter_response_variants(domain_path):
+        by_lang = explicit.setdefault(name, {})
+        if lang is None:
+            if name in unconditioned:
+                gaps["duplicate"].append((name, ANY_LANGUAGE))
+            unconditioned.setdefault(name, text)
+        elif lang in by_lang:
+            gaps["duplicate"].append((name, lang))
+        else:
+            by_lang[lang] = text
+    languages = sorted({lang for by_lang in explicit.values() for lang in by_lang} | {DEFAULT_LANGUAGE})
+
+    # (key, text, flags, language the text is written in)
+    entries: List[Tuple[bytes, str, int, str]] = []
+    for name, by_lang in explicit.items():
+        fallback = unconditioned.get(name)
+        if fallback is not None:
+            entries.append((_key(name, ANY_LANGUAGE), fallback, FALLBACK, DEFAULT_LANGUAGE))
+        for lang in languages:
+            if lang in by_lang:
+                entries.append((_key(name, lang), by_lang[lang], 0, lang))
+            elif fallback is not None:
+                entries.append((_key(name, lang), fallback, FALLBACK, DEFAULT_LANGUAGE))
+                if lang != DEFAULT_LANGUAGE:
+                    gaps["fallback"].append((name, lang))
+            else:
+                gaps["missing"].append((name, lang))
+
+    # Power-of-two table at most half full keeps probe chains short
+    n_slots = 1
+    while n_slots < 2 * len(entries):
+        n_slots *= 2
+    strings = bytearray()
+    base = HEADER.size + n_slots * SLOT.size
+    text_offsets: Dict[str, Tuple[int, int]] = {}
+
+    def put(data: bytes) -> Tuple[int, int]:
+        offset = base + len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    table = [None] * n_slots
+    for key, text, flags, text_lang in entries:
+        if text not in text_offsets:
+            text_offsets[text] = put(text.encode("utf-8"))
+        key_offset, key_length = put(key)
+        text_offset, text_length = text_offsets[text]
+        h = zlib.crc32(key)
+        i = h & (n_slots - 1)
+        while table[i] is not None:
+            i = (i + 1) & (n_slots - 1)
+        table[i] = SLOT.pack(h, key_offset, key_length, flags, text_offset, text_length,
+                             bytes.fromhex(audio_key(text_lang, text)))
+    languages_offset, languages_length = put("\0".join(languages).encode("utf-8"))
+
+    empty = SLOT.pack(0, 0, 0, 0, 0, 0, bytes(32))
+    header = HEADER.pack(INDEX_MAGIC, INDEX_VERSION, n_slots, len(entries), domain_fingerprint(domain_path),
+                         languages_offset, languages_length)
+    data = header + b"".join(slot if slot is not None else empty for slot in table) + bytes(strings)
+    return data, gaps
+
+
+class ResponseIndex:
+    """Read-only view of a compiled index, over an mmap or an in-memory buffer."""
+
+    def __init__(self, buffer):
+        magic, version, n_slots, n_entries, fingerprint, languages_offset, languages_length = \
+            HEADER.unpack_from(buffer, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("not a response index of this version")
+        self._buffer = buffer
+        self._mask = n_slots - 1
+        self._entries = n_entries
+        self.fingerprint: bytes = fingerprint
+        languages = buffer[languages_offset:languages_offset + languages_length].decode("utf-8")
+        self.languages: List[str] = languages.split("\0")
+
+    @classmethod
+    def open(cls, path: str = RESPONSE_INDEX_PATH) -> "ResponseIndex":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _probe(self, key: bytes) -> Optional[Response]:
+        buffer = self._buffer
+        h = zlib.crc32(key)
+        i = h & self._mask
+        while True:
+            slot_hash, key_offset, key_length, flags, text_offset, text_length, audio = \
+                SLOT.unpack_from(buffer, HEADER.size + i * SLOT.size)
+            if key_length == 0:
+                return None
+            if slot_hash == h and buffer[key_offset:key_offset + key_length] == key:
+                text = buffer[text_offset:text_offset + text_length].decode("utf-8")
+                return Response(text, audio.hex(), bool(flags & FALLBACK))
+            i = (i + 1) & self._mask
+
+    def lookup(self, name: str, lang: str) -> Optional[Response]:
+        """What Rasa renders for the response with the language slot set to lang."""
+        response = self._probe(_key(name, lang))
+        if response is None and lang not in self.languages:
+            response = self._probe(_key(name, ANY_LANGUAGE))
+        return response
+
+    def text(self, name: str, lang: str) -> Optional[str]:
+        response = self.lookup(name, lang)
+        return response.text if response is not None else None
+
+    def matches(self, name: str, lang: str, text: str) -> bool:
+        """Whether text is exactly what the domain renders for the response in lang."""
+        response = self.lookup(name, lang)
+        return response is not None and response.text.strip() == text.strip()
+
+    def __len__(self) -> int:
+        return self._entries
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+def write_index(data: bytes, path: str = RESPONSE_INDEX_PATH):
+    # Written aside under a unique name and swapped in, so a running process never maps
+    # a partial file and two processes rebuilding at once never share a temporary file
+    with staged_file(os.path.dirname(os.path.abspath(path))) as (f, tmp):
+        f.write(data)
+        f.close()
+        os.replace(tmp, path)
+
+
+def load_or_build(domain_path: str = DOMAIN_PATH, index_path: Optional[str] = None) -> ResponseIndex:
+    """Map the index at index_path if it matches the domain, else compile it (and save it there)."""
+    fingerprint = domain_fingerprint(domain_path)
+    if index_path and os.path.exists(index_path):
+        try:
+            index = ResponseIndex.open(index_path)
+            if index.fingerprint == fingerprint:
+                return index
+            index.close()
+        except (OSError, ValueError, struct.error):
+            pass
+    data, _ = compile_domain(domain_path)
+    if index_path:
+        try:
+            write_index(data, index_path)
+            return ResponseIndex.open(index_path)
+        except OSError:
+            pass
+    return ResponseIndex(data)
+
+
+_index: Optional[ResponseIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_response_index() -> ResponseIndex:
+    """Return the process-wide index for domain.yml, building it on first use if stale."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_or_build(DOMAIN_PATH, RESPONSE_INDEX_PATH)
+    return _index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", action="store_true", help="compile the domain and report gaps")
+    parser.add_argument("--domain", default=DOMAIN_PATH)
+    parser.add_argument("--out", default=RESPONSE_INDEX_PATH)
+    parser.add_argument("--strict", action="store_true", help="exit non-zero if any language falls back")
+    args = parser.parse_args()
+    if not args.build:
+        parser.print_help()
+        return 0
+
+    data, gaps = compile_domain(args.domain)
+    write_index(data, args.out)
+    index = ResponseIndex.open(args.out)
+    print(f"Wrote {args.out}: {len(index)} entries, languages {', '.join(index.languages)}, {len(data)} bytes")
+    index.close()
+    for name, lang in gaps["missing"]:
+        print(f"  missing   {name} [{lang}]: no variant and no unconditioned fallback")
+    fallbacks: Dict[str, List[str]] = {}
+    for name, lang in gaps["fallback"]:
+        fallbacks.setdefault(name, []).append(lang)
+    for name, langs in fallbacks.items():
+        print(f"  fallback  {name} [{', '.join(langs)}]: renders the {DEFAULT_LANGUAGE} fallback text")
+    for name, lang in gaps["duplicate"]:
+        print(f"  duplicate {name} [{lang or 'unconditioned'}]: only the first variant is indexed")
+    if gaps["missing"] or (args.strict and gaps["fallback"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
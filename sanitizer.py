@@ -0,0 +1,56 @@
+import unicodedata
+
+# Longest message accepted from the chat box, in code points after normalization
+MAX_INPUT_CHARS = 500
+
+# Control and invisible formatting characters dropped from input in the same
+# translate pass. ZWJ/ZWNJ (U+200D/U+200C) are kept: they select conjunct and
+# half forms in Devanagari, Telugu and Kannada.
+_DROPPED = (
+    [c for c in range(0x20) if chr(c) not in "\t\n\r\x0b\x0c"]
+    + list(range(0x7F, 0xA0))
+    + [0x200B, 0x2060, 0xFEFF]
+    # Bidi embeddings, overrides and isolates can visually reorder text
+    + list(range(0x202A, 0x202F)) + list(range(0x2066, 0x206A))
+)
+_STRIP_TABLE = dict.fromkeys(_DROPPED)
+
+_HTML_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+# Sentence punctuation, including the Devanagari danda, is not part of a cache key
+_KEY_TABLE = str.maketrans(dict.fromkeys("?!.,;:।॥", " "))
+
+
+def _cut(text: str, limit: int) -> str:
+    """Truncate without leaving a vowel sign or virama separated from its consonant."""
+    if len(text) <= limit:
+        return text
+    end = limit
+    while end > 0 and (unicodedata.category(text[end])[0] == "M" or text[end] in "\u200c\u200d"):
+        end -= 1
+    return text[:end].rstrip()
+
+
+def sanitize_input(user_input: str) -> str:
+    """Canonical form of a chat message: NFC, no control characters, single spaces.
+
+    Nothing the user typed is deleted or rewritten beyond that; markup is made
+    safe by escape_html() when the message is rendered.
+    """
+    if not user_input:
+        return ""
+    # Drop controls first so marks they separated are composed and ordered by NFC.
+    # Indic keyboards and IMEs differ in composed vs decomposed sequences (e.g. nukta forms).
+    text = unicodedata.normalize("NFC", user_input.translate(_STRIP_TABLE))
+    text = " ".join(text.split())
+    return _cut(text, MAX_INPUT_CHARS)
+
+
+def escape_html(text: str) -> str:
+    """Escape text for interpolation into the chat bubble HTML."""
+    return text.translate(_HTML_TABLE)
+
+
+def cache_key(message: str) -> str:
+    """Case- and punctuation-insensitive key for a sanitized message."""
+    return " ".join(message.casefold().translate(_KEY_TABLE).split())
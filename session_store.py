@@ -0,0 +1,292 @@
+"""Shared storage for chat sessions, so any chatbot process can serve any session.
+
+A session is a small JSON state (selected language, Rasa sender id) plus
+its chat history; never put credentials in it, since the session id travels
+in the page URL. Pick the backend with SESSION_STORE_URL:
+
+    sqlite:///path/to/sessions.db   (default; processes on one host)
+    redis://host:6379/0             (needs the redis package; any number of hosts)
+"""
+import os
+import abc
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+SESSION_STORE_URL = os.environ.get(
+    "SESSION_STORE_URL",
+    "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db"),
+)
+# Sessions untouched for this long are dropped
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(7 * 86400)))
+
+# (id, created, is_user, content); ids are allocated by the store, per session, from 0
+MessageRow = Tuple[int, float, bool, str]
+# before_id for load_messages that means "the newest messages"
+LATEST = 2 ** 62
+
+
+def new_session_id() -> str:
+    """A full 128-bit random id; safe to generate independently on many processes."""
+    return uuid.uuid4().hex
+
+
+def is_session_id(value: Optional[str]) -> bool:
+    return bool(value) and len(value) == 32 and all(c in "0123456789abcdef" for c in value)
+
+
+class SessionStore(abc.ABC):
+    """Interface shared by the backends."""
+
+    @abc.abstractmethod
+    def load_state(self, session_id: str) -> Optional[Dict]:
+        """The saved state, or None if the session is unknown or has expired."""
+
+    @abc.abstractmethod
+    def save_state(self, session_id: str, state: Dict):
+        """Replace the state and restart the session's expiry."""
+
+    @abc.abstractmethod
+    def reserve_message_ids(self, session_id: str, count: int) -> int:
+        """Reserve `count` consecutive ids for new messages and return the first.
+
+        Reserved atomically in the store, so several tabs or processes writing
+        the same session never hand out one id twice.
+        """
+
+    @abc.abstractmethod
+    def append_messages(self, session_id: str, rows: List[MessageRow]):
+        """Store new messages, with ids from reserve_message_ids()."""
+
+    @abc.abstractmethod
+    def update_message(self, session_id: str, row: MessageRow):
+        """Overwrite an already appended message with the same id."""
+
+    @abc.abstractmethod
+    def load_messages(self, session_id: str, before_id: int, count: int) -> List[MessageRow]:
+        """Up to `count` messages with id < before_id, oldest first."""
+
+    @abc.abstractmethod
+    def message_count(self, session_id: str) -> int:
+        """Number of stored messages."""
+
+    @abc.abstractmethod
+    def delete(self, session_id: str):
+        """Drop the state and every message."""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in one SQLite file in WAL mode; safe for several processes on a host."""
+
+    # Expired sessions are swept at most this often
+    PURGE_INTERVAL = 3600.0
+
+    def __init__(self, path: str, ttl: int = SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session TEXT NOT NULL, id INTEGER NOT NULL, created REAL NOT NULL,"
+            " is_user INTEGER NOT NULL, content TEXT NOT NULL,"
+            " PRIMARY KEY (session, id)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS message_ids (session TEXT PRIMARY KEY, next INTEGER NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def load_state(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE id = ? AND updated > ?",
+                (session_id, time.time() - self.ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_state(self, session_id: str, state: Dict):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, state, updated) VALUES (?, ?, ?)",
+                (session_id, json.dumps(state), now),
+            )
+            if now - self._last_purge > self.PURGE_INTERVAL:
+                self._last_purge = now
+                self._purge(now - self.ttl)
+
+    def _purge(self, cutoff: float):
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.execute(
+                "DELETE FROM messages WHERE session IN (SELECT id FROM sessions WHERE updated <= ?)", (cutoff,)
+            )
+            self._conn.execute(
+                "DELETE FROM message_ids WHERE session IN (SELECT id FROM sessions WHERE updated <= ?)", (cutoff,)
+            )
+            self._conn.execute("DELETE FROM sessions WHERE updated <= ?", (cutoff,))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def reserve_message_ids(self, session_id: str, count: int) -> int:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so the read and the increment are atomic
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT next FROM message_ids WHERE session = ?", (session_id,)).fetchone()
+                if row is None:
+                    # First message, or a session saved before ids were allocated here
+                    row = self._conn.execute(
+                        "SELECT COALESCE(MAX(id) + 1, 0) FROM messages WHERE session = ?", (session_id,)
+                    ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO message_ids (session, next) VALUES (?, ?)", (session_id, row[0] + count)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0]
+
+    def append_messages(self, session_id: str, rows: List[MessageRow]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # Plain INSERT: a duplicate id is a bug and must not overwrite another tab's message
+                self._conn.executemany(
+                    "INSERT INTO messages (session, id, created, is_user, content) VALUES (?, ?, ?, ?, ?)",
+                    [(session_id, i, created, int(is_user), content) for i, created, is_user, content in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_message(self, session_id: str, row: MessageRow):
+        message_id, created, is_user, content = row
+        with self._lock:
+            self._conn.execute(
+                "UPDATE messages SET created = ?, is_user = ?, content = ? WHERE session = ? AND id = ?",
+                (created, int(is_user), content, session_id, message_id),
+            )
+
+    def load_messages(self, session_id: str, before_id: int, count: int) -> List[MessageRow]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created, is_user, content FROM messages"
+                " WHERE session = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                (session_id, before_id, count),
+            ).fetchall()
+        return [(i, created, bool(is_user), content) for i, created, is_user, content in reversed(rows)]
+
+    def message_count(self, session_id: str) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE session = ?", (session_id,)
+            ).fetchone()
+        return count
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session = ?", (session_id,))
+            self._conn.execute("DELETE FROM message_ids WHERE session = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions in Redis (or a compatible server): a state string, an id counter and a
+    sorted set of messages scored by id, per session."""
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL_SECONDS):
+        if redis is None:
+            raise RuntimeError("SESSION_STORE_URL points at Redis but the redis package is not installed")
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _keys(session_id: str) -> Tuple[str, str, str]:
+        return f"chat:{session_id}:state", f"chat:{session_id}:turns", f"chat:{session_id}:next_id"
+
+    def load_state(self, session_id: str) -> Optional[Dict]:
+        raw = self._redis.get(self._keys(session_id)[0])
+        return json.loads(raw) if raw else None
+
+    def save_state(self, session_id: str, state: Dict):
+        state_key, messages_key, next_id_key = self._keys(session_id)
+        pipe = self._redis.pipeline()
+        pipe.set(state_key, json.dumps(state), ex=self.ttl)
+        pipe.expire(messages_key, self.ttl)
+        pipe.expire(next_id_key, self.ttl)
+        pipe.execute()
+
+    def reserve_message_ids(self, session_id: str, count: int) -> int:
+        next_id_key = self._keys(session_id)[2]
+        pipe = self._redis.pipeline()
+        pipe.incrby(next_id_key, count)
+        pipe.expire(next_id_key, self.ttl)
+        return pipe.execute()[0] - count
+
+    def append_messages(self, session_id: str, rows: List[MessageRow]):
+        messages_key = self._keys(session_id)[1]
+        pipe = self._redis.pipeline()
+        pipe.zadd(messages_key, {json.dumps(row): row[0] for row in rows})
+        pipe.expire(messages_key, self.ttl)
+        pipe.execute()
+
+    def update_message(self, session_id: str, row: MessageRow):
+        messages_key = self._keys(session_id)[1]
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(messages_key, row[0], row[0])
+        pipe.zadd(messages_key, {json.dumps(row): row[0]})
+        pipe.execute()
+
+    def load_messages(self, session_id: str, before_id: int, count: int) -> List[MessageRow]:
+        if before_id <= 0 or count <= 0:
+            return []
+        raw = self._redis.zrevrangebyscore(self._keys(session_id)[1], f"({before_id}", "-inf", start=0, num=count)
+        return [tuple(json.loads(item)) for item in reversed(raw)]
+
+    def message_count(self, session_id: str) -> int:
+        return self._redis.zcard(self._keys(session_id)[1])
+
+    def delete(self, session_id: str):
+        self._redis.delete(*self._keys(session_id))
+
+
+def open_store(url: str = SESSION_STORE_URL) -> SessionStore:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported SESSION_STORE_URL: {url}")
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store shared by every Streamlit session."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = open_store()
+    return _store
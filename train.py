@@ -0,0 +1,161 @@
+"""Train the Rasa model, redoing only the work the changed files require.
+
+Each training data file and each pipeline/policy component of the chosen
+config is fingerprinted. Compared with the last successful run:
+
+  nothing changed                  -> skip, the current model is up to date
+  only stories/rules changed       -> `rasa train`; NLU comes from .rasa/cache
+  NLU examples changed, same labels -> fine-tune the last model for a fraction
+                                      of the epochs (`rasa train --finetune`)
+  anything else                    -> full `rasa train`
+
+Usage:
+    python train.py                    # full profile (config.yml)
+    python train.py --profile fast     # config_fast.yml, for CI and redeploys
+    python train.py --dry-run          # print the plan and exit
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from domain_data import BASE_DIR, CONFIG_PATH, DOMAIN_PATH, NLU_PATH, RULES_PATH, STORIES_PATH, load_nlu_labels
+
+PROFILES = {
+    "full": CONFIG_PATH,
+    "fast": os.path.join(BASE_DIR, "config_fast.yml"),
+}
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+TRAIN_STATE = os.path.join(BASE_DIR, ".rasa", "train_state.json")
+# Share of the configured epochs used when fine-tuning on a few new examples
+FINETUNE_EPOCH_FRACTION = 0.2
+
+
+def file_fingerprint(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def component_fingerprints(config_path: str) -> Dict[str, str]:
+    """One hash per pipeline/policy entry, so a changed setting is attributed to its component."""
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    fingerprints = {"language": str(config.get("language"))}
+    for section in ("pipeline", "policies"):
+        for i, component in enumerate(config.get(section) or []):
+            key = f"{section}[{i}]:{component.get('name')}"
+            fingerprints[key] = hashlib.sha256(json.dumps(component, sort_keys=True).encode()).hexdigest()
+    return fingerprints
+
+
+def current_state(profile: str, paths: Dict[str, str]) -> Dict:
+    intents, entities = load_nlu_labels(paths["nlu"])
+    return {
+        "profile": profile,
+        "files": {name: file_fingerprint(path) for name, path in paths.items()},
+        "components": component_fingerprints(PROFILES[profile]),
+        "labels": {"intents": intents, "entities": entities},
+    }
+
+
+def load_previous(state_path: str) -> Optional[Dict]:
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def plan_training(previous: Optional[Dict], current: Dict) -> Tuple[str, List[str]]:
+    """Pick "skip", "core", "finetune" or "full" and say why."""
+    if previous is None or not os.path.exists(previous.get("model", "")):
+        return "full", ["no previous model"]
+    if previous["profile"] != current["profile"]:
+        return "full", [f"profile changed from {previous['profile']}"]
+    changed_components = [k for k, v in current["components"].items() if previous["components"].get(k) != v]
+    changed_components += [k for k in previous["components"] if k not in current["components"]]
+    if changed_components:
+        return "full", [f"config changed: {', '.join(changed_components)}"]
+    changed_files = [k for k, v in current["files"].items() if previous["files"].get(k) != v]
+    if not changed_files:
+        return "skip", ["no data or config changes"]
+    if "domain" in changed_files:
+        return "full", ["domain changed"]
+    if "nlu" not in changed_files:
+        return "core", [f"{', '.join(changed_files)} changed; NLU is reused from the cache"]
+    if previous["labels"] != current["labels"]:
+        return "full", ["intents or entities were added or removed"]
+    return "finetune", [f"{', '.join(changed_files)} changed with the same intents and entities"]
+
+
+def rasa_train_command(mode: str, profile: str, paths: Dict[str, str], out: str,
+                       previous_model: Optional[str]) -> List[str]:
+    command = [
+        "rasa", "train", "--config", PROFILES[profile], "--domain", paths["domain"],
+        "--data", paths["nlu"], paths["rules"], paths["stories"],
+        "--out", out, "--fixed-model-name", profile,
+    ]
+    if mode == "finetune":
+        command += ["--finetune", previous_model, "--epoch-fraction", str(FINETUNE_EPOCH_FRACTION)]
+    return command
+
+
+def train(profile: str = "full", paths: Optional[Dict[str, str]] = None, out: str = MODELS_DIR,
+          state_path: str = TRAIN_STATE, force_full: bool = False, dry_run: bool = False) -> Dict:
+    """Run the training the changes call for; returns mode, reasons, seconds and model path."""
+    paths = paths or {"domain": DOMAIN_PATH, "nlu": NLU_PATH, "rules": RULES_PATH, "stories": STORIES_PATH}
+    previous = load_previous(state_path)
+    current = current_state(profile, paths)
+    mode, reasons = ("full", ["forced"]) if force_full else plan_training(previous, current)
+    result = {"mode": mode, "reasons": reasons, "seconds": 0.0,
+              "model": previous.get("model") if previous and mode == "skip" else None}
+    if dry_run or mode == "skip":
+        return result
+
+    model_path = os.path.join(out, f"{profile}.tar.gz")
+    previous_model = None
+    if mode == "finetune":
+        # rasa writes the new model over --fixed-model-name, so fine-tune from a copy
+        previous_model = os.path.join(out, f"{profile}.previous.tar.gz")
+        os.replace(previous["model"], previous_model)
+    start = time.perf_counter()
+    try:
+        subprocess.run(rasa_train_command(mode, profile, paths, out, previous_model), check=True, cwd=BASE_DIR)
+    except (OSError, subprocess.CalledProcessError):
+        if previous_model is not None and not os.path.exists(model_path):
+            os.replace(previous_model, model_path)
+        raise
+    result["seconds"] = round(time.perf_counter() - start, 1)
+    result["model"] = model_path
+    if previous_model is not None:
+        os.remove(previous_model)
+
+    current["model"] = model_path
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="full")
+    parser.add_argument("--full", action="store_true", help="ignore fingerprints and retrain everything")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    result = train(args.profile, force_full=args.full, dry_run=args.dry_run)
+    print(f"{result['mode']}: {'; '.join(result['reasons'])}")
+    if result["seconds"]:
+        print(f"trained {result['model']} in {result['seconds']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Prebuilt speech for the static responses in domain.yml.
+
+Build (or refresh) the bundle with:  python tts_bundle.py --domain domain.yml --out tts_bundle
+Only responses whose text changed since the last build are synthesized again.
+"""
+import os
+import json
+import mmap
+import hashlib
+import argparse
+from typing import Dict, Optional, Tuple
+
+from bundle_utils import audio_key, clean_for_speech, staged_file
+from domain_data import DOMAIN_PATH, iter_domain_responses
+from tts_pipeline import _load_backend
+
+TTS_BUNDLE_DIR = os.environ.get("TTS_BUNDLE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_bundle"))
+MANIFEST_FILE = "manifest.json"
+BUNDLE_VERSION = 1
+
+
+class AudioBundle:
+    """Read-only, memory-mapped view of a built bundle."""
+
+    def __init__(self, bundle_dir: str = TTS_BUNDLE_DIR):
+        self.bundle_dir = bundle_dir
+        with open(os.path.join(bundle_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.entries: Dict[str, Tuple[int, int]] = {
+            key: (e["offset"], e["length"]) for key, e in manifest["entries"].items()
+        }
+        self.responses: Dict[str, str] = manifest.get("responses", {})
+        self.audio_file: str = manifest["audio_file"]
+        self._file = open(os.path.join(bundle_dir, self.audio_file), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def get_by_key(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None or self._map is None:
+            return None
+        offset, length = entry
+        return self._map[offset:offset + length]
+
+    def get(self, lang: str, text: str) -> Optional[bytes]:
+        """Prebuilt audio for reply text, or None if it is not in the bundle."""
+        return self.get_by_key(audio_key(lang, text))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+def load_bundle(bundle_dir: str = TTS_BUNDLE_DIR) -> Optional[AudioBundle]:
+    """Open the bundle if one has been built, otherwise return None."""
+    if not os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE)):
+        return None
+    try:
+        return AudioBundle(bundle_dir)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_bundle(domain_path: str, bundle_dir: str = TTS_BUNDLE_DIR, synthesize=None) -> Dict[str, int]:
+    """Render every domain response into the bundle, reusing audio whose text is unchanged."""
+    if synthesize is None:
+        synthesize, returns_audio = _load_backend()
+        if synthesize is None or not returns_audio:
+            raise RuntimeError("No text-to-speech backend that returns audio is available")
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    previous = load_bundle(bundle_dir)
+
+    responses: Dict[str, str] = {}
+    wanted: Dict[str, Tuple[str, str]] = {}
+    for name, lang, text in iter_domain_responses(domain_path):
+        key = audio_key(lang, text)
+        responses[f"{name}/{lang}"] = key
+        wanted.setdefault(key, (lang, clean_for_speech(text)))
+
+    stats = {"reused": 0, "synthesized": 0, "dropped": 0}
+    entries: Dict[str, Dict[str, int]] = {}
+    digest = hashlib.sha256()
+    with staged_file(bundle_dir) as (out, tmp_audio):
+        for key, (lang, text) in sorted(wanted.items()):
+            audio = previous.get_by_key(key) if previous is not None else None
+            if audio is not None:
+                stats["reused"] += 1
+            else:
+                audio = synthesize(text, lang)
+                stats["synthesized"] += 1
+            entries[key] = {"offset": out.tell(), "length": len(audio)}
+            out.write(audio)
+            digest.update(audio)
+        out.close()
+        # The audio file is named after its content and the manifest is swapped in
+        # last, so readers always see a manifest that matches the file it points to
+        audio_file = f"audio-{digest.hexdigest()[:16]}.bin"
+        os.replace(tmp_audio, os.path.join(bundle_dir, audio_file))
+
+    manifest = {"version": BUNDLE_VERSION, "audio_file": audio_file,
+                "entries": entries, "responses": responses}
+    with staged_file(bundle_dir, "w", encoding="utf-8") as (f, tmp_manifest):
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.close()
+        os.replace(tmp_manifest, os.path.join(bundle_dir, MANIFEST_FILE))
+
+    if previous is not None:
+        stats["dropped"] = len(set(previous.entries) - set(wanted))
+        previous.close()
+        if previous.audio_file != audio_file:
+            os.remove(os.path.join(bundle_dir, previous.audio_file))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--domain", default=DOMAIN_PATH)
+    parser.add_argument("--out", default=TTS_BUNDLE_DIR)
+    args = parser.parse_args()
+    stats = build_bundle(args.domain, args.out)
+    print(f"Bundle written to {args.out}: {stats['synthesized']} synthesized, "
+          f"{stats['reused']} reused, {stats['dropped']} stale entries dropped")
+
+
+if __name__ == "__main__":
+    main()
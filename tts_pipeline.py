@@ -0,0 +1,207 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bundle_utils import clean_for_speech
+from instrumentation import span
+
+# Pipeline configuration (overridable through environment variables)
+TTS_WORKERS = int(os.environ.get("TTS_WORKERS", "2"))
+TTS_QUEUE_SIZE = int(os.environ.get("TTS_QUEUE_SIZE", "32"))
+TTS_CACHE_SIZE = int(os.environ.get("TTS_CACHE_SIZE", "256"))
+
+def _load_backend() -> Tuple[Optional[Callable[[str, str], Optional[bytes]]], bool]:
+    """Resolve the speech backend as (synthesize(text, lang), returns_audio)."""
+    try:
+        import TextToSpeech
+    except ImportError:
+        TextToSpeech = None
+    if TextToSpeech is not None:
+        if hasattr(TextToSpeech, "synthesize"):
+            return TextToSpeech.synthesize, True
+        if hasattr(TextToSpeech, "some"):
+            # Legacy backend speaks on the server and returns nothing to cache
+            return (lambda text, lang: TextToSpeech.some(text)), False
+    try:
+        from gtts import gTTS
+    except ImportError:
+        return None, False
+
+    def synthesize(text: str, lang: str) -> bytes:
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buf)
+        return buf.getvalue()
+
+    return synthesize, True
+
+
+class AudioCache:
+    """Thread-safe LRU cache of synthesized audio keyed by (language code, text)."""
+
+    def __init__(self, max_entries: int = TTS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, lang: str, text: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._data.get((lang, text))
+            if audio is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end((lang, text))
+            self.hits += 1
+            return audio
+
+    def put(self, lang: str, text: str, audio: bytes):
+        with self._lock:
+            self._data[(lang, text)] = audio
+            self._data.move_to_end((lang, text))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SpeechJob:
+    """Audio for the bot replies of one turn, filled in by the worker pool."""
+
+    def __init__(self, session_id: str, generation: int):
+        self.session_id = session_id
+        self.generation = generation
+        self.futures: List[Future] = []
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+    def cancel(self):
+        for f in self.futures:
+            f.cancel()
+
+    def results(self) -> List[bytes]:
+        """Audio clips that finished successfully, in reply order."""
+        out = []
+        for f in self.futures:
+            if f.done() and not f.cancelled() and f.exception() is None and f.result():
+                out.append(f.result())
+        return out
+
+
+class TTSPipeline:
+    """Synthesizes bot replies on a bounded background pool, off the UI thread."""
+
+    def __init__(self, workers: int = TTS_WORKERS, queue_size: int = TTS_QUEUE_SIZE,
+                 cache: Optional[AudioCache] = None, backend=None, bundle=None):
+        if backend is None:
+            backend = _load_backend()
+        self.synthesize, self.returns_audio = backend
+        self.cache = cache if cache is not None else AudioCache()
+        # Prebuilt audio for domain.yml responses (see tts_bundle.py)
+        self.bundle = bundle
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._generations: Dict[str, int] = {}
+        self._jobs: Dict[str, SpeechJob] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.synthesize is not None or self.bundle is not None
+
+    def _lookup(self, lang: str, text: str) -> Optional[bytes]:
+        """Audio that is already available without synthesis."""
+        if self.bundle is not None:
+            audio = self.bundle.get(lang, text)
+            if audio is not None:
+                return audio
+        if self.returns_audio:
+            return self.cache.get(lang, text)
+        return None
+
+    def _is_current(self, job: SpeechJob) -> bool:
+        return self._generations.get(job.session_id) == job.generation
+
+    def _run(self, job: SpeechJob, lang: str, text: str) -> Optional[bytes]:
+        try:
+            # A newer message arrived while this reply was queued
+            if not self._is_current(job):
+                return None
+            audio = self._lookup(lang, text)
+            if audio is not None or self.synthesize is None:
+                return audio
+            with span("tts_synthesize", job.session_id):
+                audio = self.synthesize(text, lang)
+            if self.returns_audio and audio:
+                self.cache.put(lang, text, audio)
+            return audio
+        finally:
+            self._slots.release()
+
+    def start(self, session_id: str) -> Optional[SpeechJob]:
+        """Open a job for a new turn, cancelling the session's previous turn."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            generation = self._generations.get(session_id, 0) + 1
+            self._generations[session_id] = generation
+            previous = self._jobs.get(session_id)
+            job = SpeechJob(session_id, generation)
+            self._jobs[session_id] = job
+        if previous is not None:
+            previous.cancel()
+        return job
+
+    def add(self, job: SpeechJob, lang: str, reply: str):
+        """Queue speech for one reply of the job's turn."""
+        text = clean_for_speech(reply)
+        if not text:
+            return
+        audio = self._lookup(lang, text)
+        if audio is not None:
+            done: Future = Future()
+            done.set_result(audio)
+            job.futures.append(done)
+            return
+        if self.synthesize is None:
+            return
+        if not self._slots.acquire(blocking=False):
+            # Queue is full; skip speech rather than stall the chat
+            self.dropped += 1
+            return
+        future = self._executor.submit(self._run, job, lang, text)
+        # A cancelled future never runs _run, so give its slot back here
+        future.add_done_callback(lambda f: f.cancelled() and self._slots.release())
+        job.futures.append(future)
+
+    def submit(self, session_id: str, lang: str, replies: List[str]) -> Optional[SpeechJob]:
+        """Queue speech for one turn's replies, cancelling the session's previous turn."""
+        job = self.start(session_id)
+        if job is not None:
+            for reply in replies:
+                self.add(job, lang, reply)
+        return job
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pipeline: Optional[TTSPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_tts_pipeline() -> TTSPipeline:
+    """Return the process-wide pipeline shared by every Streamlit session."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                from tts_bundle import load_bundle
+                _pipeline = TTSPipeline(bundle=load_bundle())
+    return _pipeline
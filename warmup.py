@@ -0,0 +1,76 @@
+"""Once-per-process warm-up for the Streamlit app.
+
+chatbot.py renders its first page without importing the Rasa backend,
+the FAQ cache or the analytics log (requests and httpx alone cost
+well over 100 ms to import). warm_up() then initializes them from a
+background thread, so their first real use is a dictionary lookup instead
+of an import and a connection set-up.
+"""
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+_warm_started = False
+_warm_lock = threading.Lock()
+
+
+def _backend():
+    from async_backend import get_backend
+    return get_backend()
+
+
+def _faq_cache():
+    from faq_cache import get_faq_cache
+    return get_faq_cache()
+
+
+def _event_log():
+    from analytics import get_event_log
+    return get_event_log()
+
+
+def _session_store():
+    from session_store import get_session_store
+    return get_session_store()
+
+
+# Pooled clients and caches in the order the first turn needs them
+WARM_UP_STEPS: List[Tuple[str, Callable[[], object]]] = [
+    ("session_store", _session_store),
+    ("backend", _backend),
+    ("faq_cache", _faq_cache),
+    ("event_log", _event_log),
+]
+
+
+def run_warm_up():
+    """Initialize every step in the calling thread; a failing step is logged and skipped."""
+    for name, step in WARM_UP_STEPS:
+        try:
+            with span(f"warm_up_{name}"):
+                step()
+        except Exception:
+            logger.exception("Warm-up of %s failed", name)
+
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """Run the warm-up once per process, in a daemon thread unless told otherwise.
+
+    Cheap to call on every script run: only the first call does anything, and
+    it returns the warm-up thread so callers (the startup benchmark) can join it.
+    """
+    global _warm_started
+    with _warm_lock:
+        if _warm_started:
+            return None
+        _warm_started = True
+    if not background:
+        run_warm_up()
+        return None
+    thread = threading.Thread(target=run_warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread